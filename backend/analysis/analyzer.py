@@ -1,71 +1,247 @@
 import os
-import subprocess
 import json
+import tempfile
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 import logging
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis.limits import AnalysisCancelled, ResourceBudget
+from analysis.dedup import DuplicateIndex
+from analysis.exclusions import IGNORE_FILENAME, PathFilter
+from analysis.violation_store import ViolationStore
+from analysis.profiling import SHOWTIME_MODE, CppcheckProfiler
 
 logger = logging.getLogger(__name__)
 
+SOURCE_EXTENSIONS = ('.c', '.cpp', '.h', '.hpp')
+
 
 class MISRAAnalyzer:
-    def __init__(self, source_dir: str):
-        self.source_dir = Path(source_dir)
+    def __init__(self, source_dir: str, jobs: Optional[int] = None, budget: Optional[ResourceBudget] = None,
+                 exclude: Optional[List[str]] = None, profile: bool = False, root_dir: Optional[str] = None):
+        # Resolved so ancestor walks terminate and symlinked extract roots match component paths
+        self.source_dir = Path(source_dir).resolve()
+        self.root_dir = Path(root_dir).resolve() if root_dir else self.source_dir
+        self.jobs = jobs
+        self.budget = budget or ResourceBudget.from_env()
+        self.exclude = exclude or []
+        self.profile = profile
+        self.timing_profile = None
+        self.tool_errors = []
         self.c_files = []
         self.h_files = []
+        self.excluded_paths = []
         self.all_violations = []
+        self.duplicate_index = None
         
     def find_source_files(self):
-        """Find all C/C++ source files"""
-        self.c_files = list(self.source_dir.rglob("*.c"))
-        self.c_files.extend(list(self.source_dir.rglob("*.cpp")))
-        self.h_files = list(self.source_dir.rglob("*.h"))
-        self.h_files.extend(list(self.source_dir.rglob("*.hpp")))
+        """Find all C/C++ source files, pruning excluded directories while walking"""
+        self.c_files = []
+        self.h_files = []
+        self.excluded_paths = []
+        filters = [PathFilter(self.exclude, self.root_dir)] if self.exclude else []
+        
+        # Ignore files between the exclusion root and the analyzed directory still apply
+        ancestor = self.source_dir.parent
+        while ancestor != ancestor.parent and (ancestor == self.root_dir or self.root_dir in ancestor.parents):
+            if (ancestor / IGNORE_FILENAME).is_file():
+                filters.append(PathFilter.from_file(ancestor / IGNORE_FILENAME))
+            ancestor = ancestor.parent
+        
+        for dirpath, dirnames, filenames in os.walk(self.source_dir):
+            current = Path(dirpath)
+            if IGNORE_FILENAME in filenames:
+                filters.append(PathFilter.from_file(current / IGNORE_FILENAME))
+            active = [f for f in filters if f.base == current or f.base in current.parents]
+            
+            kept = []
+            for name in sorted(dirnames):
+                path = current / name
+                if any(f.is_excluded(path, True) for f in active):
+                    self.excluded_paths.append(str(path.relative_to(self.source_dir)) + '/')
+                else:
+                    kept.append(name)
+            dirnames[:] = kept
+            
+            for name in sorted(filenames):
+                suffix = os.path.splitext(name)[1]
+                if suffix not in SOURCE_EXTENSIONS:
+                    continue
+                path = current / name
+                if any(f.is_excluded(path, False) for f in active):
+                    self.excluded_paths.append(str(path.relative_to(self.source_dir)))
+                elif suffix in ('.c', '.cpp'):
+                    self.c_files.append(path)
+                else:
+                    self.h_files.append(path)
+        
+        if self.excluded_paths:
+            logger.info(f"Excluded {len(self.excluded_paths)} paths from analysis")
         
         all_files = self.c_files + self.h_files
         logger.info(f"Found {len(all_files)} source files")
+        
+        self.duplicate_index = DuplicateIndex(self.source_dir, all_files, self.c_files)
         return all_files
     
-    def run_cppcheck(self) -> List[Dict]:
-        """Run Cppcheck with MISRA addon"""
-        violations = []
+    def _drop_excluded(self, violations: Iterable[Dict]) -> Iterator[Dict]:
+        """Skip findings in excluded paths, e.g. third-party headers included by kept sources"""
+        excluded_files = {p for p in self.excluded_paths if not p.endswith('/')}
+        excluded_dirs = tuple(p[:-1] + os.sep for p in self.excluded_paths if p.endswith('/'))
+        dropped = 0
+        for v in violations:
+            if v['file'] in excluded_files or v['file'].startswith(excluded_dirs):
+                dropped += 1
+                continue
+            yield v
+        if dropped:
+            logger.info(f"Dropped {dropped} findings in excluded paths")
+    
+    def _record_tool_error(self, tool: str, detail: str):
+        logger.error(f"{tool} failed: {detail}")
+        self.tool_errors.append({'tool': tool, 'detail': detail})
+    
+    def _units_to_analyze(self) -> List[Path]:
+        """Translation units left after collapsing duplicate copies"""
+        if self.duplicate_index is None:
+            return self.c_files
+        return self.duplicate_index.representatives(self.c_files)
+    
+    def iter_cppcheck(self) -> Iterator[Dict]:
+        """Run Cppcheck and stream parsed violations from its output file"""
         all_files = self.c_files + self.h_files
         
         if not all_files:
-            return violations
+            return
+        
+        with tempfile.TemporaryDirectory(prefix="misra_cppcheck_") as tmp_dir:
+            output_file = Path(tmp_dir) / "cppcheck.txt"
+            
+            try:
+                cmd = [
+                    "cppcheck",
+                    "--enable=all",
+                    "--inconclusive",
+                    "--suppress=missingIncludeSystem",
+                    "--template={file}|||{line}|||{severity}|||{id}|||{message}",
+                    f"--output-file={output_file}",
+                ]
+                if self.jobs and self.jobs > 1:
+                    # Without a build dir cppcheck skips unusedFunction (Rule 2.1) under -j
+                    build_dir = Path(tmp_dir) / "build"
+                    build_dir.mkdir()
+                    cmd.extend([f"-j{self.jobs}", f"--cppcheck-build-dir={build_dir}"])
+                profiler = None
+                if self.profile:
+                    cmd.append(f"--showtime={SHOWTIME_MODE}")
+                    profiler = CppcheckProfiler(self.source_dir)
+                if self.excluded_paths or (self.duplicate_index and self.duplicate_index.skipped):
+                    file_list = Path(tmp_dir) / "files.txt"
+                    file_list.write_text('\n'.join(str(u) for u in self._units_to_analyze()))
+                    cmd.append(f"--file-list={file_list}")
+                else:
+                    cmd.append(str(self.source_dir))
+                
+                result = self.budget.run(
+                    cmd, tool="cppcheck", target=str(self.source_dir), timeout=300,
+                    line_callback=profiler.feed if profiler else None
+                )
+                if profiler:
+                    self.timing_profile = profiler.profile()
+                if result is None:
+                    self._record_tool_error("cppcheck", "timed out, results are incomplete")
+                    return
+                if result.returncode != 0:
+                    self._record_tool_error("cppcheck", f"exited with code {result.returncode}")
+                if not output_file.exists():
+                    return
+                
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                self._record_tool_error("cppcheck", str(e))
+                return
+            
+            with open(output_file, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if '|||' in line:
+                        violation = self._parse_cppcheck_line(line)
+                        if violation:
+                            yield violation
+    
+    def _parse_cppcheck_line(self, line: str) -> Optional[Dict]:
+        """Parse one line of Cppcheck template output"""
+        try:
+            parts = line.split('|||')
+            if len(parts) >= 5:
+                file_path = parts[0].strip()
+                line_num = parts[1].strip()
+                severity = parts[2].strip()
+                rule_id = parts[3].strip()
+                message = parts[4].strip()
+                
+                misra_rule = self._map_to_misra_rule(rule_id)
+                rule_data = self._get_rule_data(misra_rule)
+                
+                relative_path = Path(file_path).relative_to(self.source_dir) if self.source_dir in Path(file_path).parents else Path(file_path).name
+                
+                return {
+                    "file": str(relative_path),
+                    "line": int(line_num) if line_num.isdigit() else 0,
+                    "severity": self._map_severity(severity),
+                    "rule": misra_rule,
+                    "message": message,
+                    "description": rule_data['desc'],
+                    "solution": rule_data['solution'],
+                    "tool": "cppcheck",
+                    "type": severity
+                }
+        except Exception as e:
+            logger.debug(f"Failed to parse line: {line}, error: {e}")
+        return None
+    
+    def run_clang_tidy(self) -> List[Dict]:
+        """Run Clang-Tidy"""
+        violations = []
+        
+        with ThreadPoolExecutor(max_workers=self.jobs or 1) as executor:
+            for file_violations in executor.map(self._run_clang_tidy_file, self._units_to_analyze()):
+                violations.extend(file_violations)
+        
+        logger.info(f"Clang-tidy found {len(violations)} issues")
+        return violations
+    
+    def _run_clang_tidy_file(self, c_file: Path) -> List[Dict]:
+        """Run Clang-Tidy on a single translation unit"""
+        violations = []
         
         try:
             cmd = [
-                "cppcheck",
-                "--enable=all",
-                "--inconclusive",
-                "--suppress=missingIncludeSystem",
-                "--template={file}|||{line}|||{severity}|||{id}|||{message}",
-                str(self.source_dir)
+                "clang-tidy",
+                str(c_file),
+                "--",
+                "-I" + str(self.source_dir)
             ]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            result = self.budget.run(cmd, tool="clang-tidy", target=str(c_file), timeout=60)
+            if result is None:
+                return violations
             
-            output = result.stderr + result.stdout
+            output = result.stdout
             
             for line in output.split('\n'):
-                if '|||' in line:
+                if ':' in line and 'warning:' in line or 'error:' in line:
                     try:
-                        parts = line.split('|||')
-                        if len(parts) >= 5:
+                        parts = line.split(':')
+                        if len(parts) >= 4:
                             file_path = parts[0].strip()
                             line_num = parts[1].strip()
-                            severity = parts[2].strip()
-                            rule_id = parts[3].strip()
-                            message = parts[4].strip()
+                            severity = 'warning' if 'warning' in line else 'error'
+                            message = ':'.join(parts[3:]).strip()
                             
-                            misra_rule = self._map_to_misra_rule(rule_id)
+                            misra_rule = "MISRA C:2012 Rule 17.7"
                             rule_data = self._get_rule_data(misra_rule)
                             
                             relative_path = Path(file_path).relative_to(self.source_dir) if self.source_dir in Path(file_path).parents else Path(file_path).name
@@ -75,85 +251,21 @@ class MISRAAnalyzer:
                                 "line": int(line_num) if line_num.isdigit() else 0,
                                 "severity": self._map_severity(severity),
                                 "rule": misra_rule,
-                                "message": message,
+                                "message": message[:200],
                                 "description": rule_data['desc'],
                                 "solution": rule_data['solution'],
-                                "tool": "cppcheck",
+                                "tool": "clang-tidy",
                                 "type": severity
                             })
                     except Exception as e:
-                        logger.debug(f"Failed to parse line: {line}, error: {e}")
+                        logger.debug(f"Failed to parse clang-tidy line: {e}")
                         continue
             
-            logger.info(f"Cppcheck found {len(violations)} issues")
-            
-        except subprocess.TimeoutExpired:
-            logger.error("Cppcheck timeout")
+        except AnalysisCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Cppcheck failed: {str(e)}")
-        
-        return violations
-    
-    def run_clang_tidy(self) -> List[Dict]:
-        """Run Clang-Tidy"""
-        violations = []
-        
-        for c_file in self.c_files:
-            try:
-                cmd = [
-                    "clang-tidy",
-                    str(c_file),
-                    "--",
-                    "-I" + str(self.source_dir)
-                ]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                
-                output = result.stdout
-                
-                for line in output.split('\n'):
-                    if ':' in line and 'warning:' in line or 'error:' in line:
-                        try:
-                            parts = line.split(':')
-                            if len(parts) >= 4:
-                                file_path = parts[0].strip()
-                                line_num = parts[1].strip()
-                                severity = 'warning' if 'warning' in line else 'error'
-                                message = ':'.join(parts[3:]).strip()
-                                
-                                misra_rule = "MISRA C:2012 Rule 17.7"
-                                rule_data = self._get_rule_data(misra_rule)
-                                
-                                relative_path = Path(file_path).relative_to(self.source_dir) if self.source_dir in Path(file_path).parents else Path(file_path).name
-                                
-                                violations.append({
-                                    "file": str(relative_path),
-                                    "line": int(line_num) if line_num.isdigit() else 0,
-                                    "severity": self._map_severity(severity),
-                                    "rule": misra_rule,
-                                    "message": message[:200],
-                                    "description": rule_data['desc'],
-                                    "solution": rule_data['solution'],
-                                    "tool": "clang-tidy",
-                                    "type": severity
-                                })
-                        except Exception as e:
-                            logger.debug(f"Failed to parse clang-tidy line: {e}")
-                            continue
-                
-            except subprocess.TimeoutExpired:
-                logger.warning(f"Clang-tidy timeout for {c_file}")
-                continue
-            except Exception as e:
-                logger.debug(f"Clang-tidy failed for {c_file}: {e}")
-                continue
+            logger.debug(f"Clang-tidy failed for {c_file}: {e}")
         
-        logger.info(f"Clang-tidy found {len(violations)} issues")
         return violations
     
     def _map_severity(self, severity: str) -> str:
@@ -267,21 +379,8 @@ class MISRAAnalyzer:
         
         return rule_mapping.get(rule_id, f'MISRA C:2012 Rule {rule_id}')
     
-    def deduplicate_violations(self, violations: List[Dict]) -> List[Dict]:
-        """Remove duplicate violations"""
-        seen = set()
-        unique_violations = []
-        
-        for v in violations:
-            key = (v['file'], v['line'], v['rule'])
-            if key not in seen:
-                seen.add(key)
-                unique_violations.append(v)
-        
-        return unique_violations
-    
-    def generate_statistics(self, violations: List[Dict]) -> Dict:
-        """Generate summary statistics"""
+    def generate_statistics(self, violations: Iterable[Dict]) -> Dict:
+        """Generate summary statistics in a single pass over the violations"""
         file_stats = defaultdict(lambda: {
             'messages': 0,
             'error': 0,
@@ -293,7 +392,16 @@ class MISRAAnalyzer:
             'advisory': 0
         })
         
+        total_violations = 0
+        severity_counts = {
+            'mandatory': 0,
+            'required': 0,
+            'advisory': 0
+        }
+        rule_counts = defaultdict(int)
+        
         for v in violations:
+            total_violations += 1
             file_name = v['file']
             file_stats[file_name]['messages'] += 1
             
@@ -306,29 +414,30 @@ class MISRAAnalyzer:
             severity = v['severity'].lower()
             if severity in file_stats[file_name]:
                 file_stats[file_name][severity] += 1
+            if severity in severity_counts:
+                severity_counts[severity] += 1
+            
+            rule_counts[(v['rule'], v['severity'])] += 1
         
-        total_violations = len(violations)
         total_files = len(self.c_files) + len(self.h_files)
         
         total_lines = 0
         for f in self.c_files + self.h_files:
             try:
                 with open(f, 'r', encoding='utf-8', errors='ignore') as file:
-                    total_lines += len(file.readlines())
+                    total_lines += sum(1 for _ in file)
             except:
                 pass
         
-        severity_counts = {
-            'mandatory': sum(1 for v in violations if v['severity'] == 'Mandatory'),
-            'required': sum(1 for v in violations if v['severity'] == 'Required'),
-            'advisory': sum(1 for v in violations if v['severity'] == 'Advisory')
-        }
-        
         return {
             'files_analyzed': total_files,
             'lines_analyzed': total_lines,
             'total_violations': total_violations,
             'severity_counts': severity_counts,
+            'rule_counts': [
+                {'rule': rule, 'severity': severity, 'count': count}
+                for (rule, severity), count in sorted(rule_counts.items())
+            ],
             'file_stats': dict(file_stats)
         }
     
@@ -339,22 +448,34 @@ class MISRAAnalyzer:
         if not self.c_files and not self.h_files:
             raise Exception("No C/C++ source files found in the uploaded archive")
         
-        violations = []
-        violations.extend(self.run_cppcheck())
+        # Deduplicates on insert and spills to disk for very large result sets
+        store = ViolationStore()
+        store.extend(self._drop_excluded(self.duplicate_index.fan_out(self.iter_cppcheck())))
+        logger.info(f"Cppcheck found {len(store)} unique issues")
         
-        violations = self.deduplicate_violations(violations)
+        if self.budget.cancelled:
+            store.close()
+            raise AnalysisCancelled()
         
-        violations.sort(key=lambda x: (x['file'], x['line']))
+        violations = store.result()
         
         statistics = self.generate_statistics(violations)
+        statistics['duplicates'] = self.duplicate_index.stats()
+        statistics['excluded_paths'] = self.excluded_paths
+        if self.timing_profile:
+            statistics['profile'] = self.timing_profile
         
         return {
             'violations': violations,
-            'summary': statistics
+            'summary': statistics,
+            'resource_breaches': list(self.budget.breaches),
+            'tool_errors': self.tool_errors
         }
 
 
-def run_analysis(source_dir: str) -> Dict:
+def run_analysis(source_dir: str, jobs: Optional[int] = None, budget: Optional[ResourceBudget] = None,
+                 exclude: Optional[List[str]] = None, profile: bool = False, root_dir: Optional[str] = None) -> Dict:
     """Main analysis function"""
-    analyzer = MISRAAnalyzer(source_dir)
+    analyzer = MISRAAnalyzer(source_dir, jobs=jobs, budget=budget, exclude=exclude, profile=profile,
+                             root_dir=root_dir)
     return analyzer.analyze()
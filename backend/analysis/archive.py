@@ -0,0 +1,167 @@
+import os
+import shutil
+import zipfile
+import logging
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional
+
+from analysis.analyzer import SOURCE_EXTENSIONS
+from analysis.limits import AnalysisCancelled
+from analysis.exclusions import IGNORE_FILENAME
+from analysis.components import MANIFEST_FILENAME
+
+logger = logging.getLogger(__name__)
+
+# Textual includes are not analyzed themselves but are needed to preprocess sources
+EXTRACT_EXTENSIONS = SOURCE_EXTENSIONS + ('.inc',)
+
+MAX_UNCOMPRESSED_BYTES = int(os.environ.get('MAX_UNCOMPRESSED_BYTES', 2 * 1024 ** 3))
+MAX_COMPRESSION_RATIO = int(os.environ.get('MAX_COMPRESSION_RATIO', 100))
+MAX_SOURCE_FILES = int(os.environ.get('MAX_SOURCE_FILES', 50000))
+WARN_SOURCE_FILES = int(os.environ.get('WARN_SOURCE_FILES', 5000))
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveRejected(Exception):
+    """Raised when an uploaded archive fails the pre-flight checks"""
+
+
+def _is_relevant(name: str) -> bool:
+    path = PurePosixPath(name)
+    return path.suffix in EXTRACT_EXTENSIONS or path.name in (IGNORE_FILENAME, MANIFEST_FILENAME)
+
+
+def _safe_member_path(name: str) -> PurePosixPath:
+    """Normalise a member name and refuse absolute or escaping paths"""
+    path = PurePosixPath(name.replace('\\', '/'))
+    if path.is_absolute() or '..' in path.parts:
+        raise ArchiveRejected(f"Unsafe path in archive: {name}")
+    return path
+
+
+def inspect_archive(zip_path: str) -> Dict:
+    """Estimate extraction cost from the ZIP central directory without extracting"""
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            members = zf.infolist()
+    except zipfile.BadZipFile as e:
+        raise ArchiveRejected(f"Invalid ZIP archive: {str(e)}")
+
+    source_files = 0
+    header_files = 0
+    source_bytes = 0
+    source_compressed_bytes = 0
+    total_bytes = 0
+    relevant = []
+
+    for info in members:
+        if info.is_dir():
+            continue
+        total_bytes += info.file_size
+        if _is_relevant(info.filename):
+            _safe_member_path(info.filename)
+            relevant.append(info.filename)
+            source_bytes += info.file_size
+            source_compressed_bytes += info.compress_size
+            suffix = PurePosixPath(info.filename).suffix
+            if suffix in SOURCE_EXTENSIONS:
+                source_files += 1
+            if suffix in ('.h', '.hpp'):
+                header_files += 1
+
+    return {
+        'members': len(members),
+        'total_bytes': total_bytes,
+        'source_files': source_files,
+        'header_files': header_files,
+        'source_bytes': source_bytes,
+        'source_compressed_bytes': source_compressed_bytes,
+        'relevant_members': relevant
+    }
+
+
+def check_archive(inventory: Dict) -> List[str]:
+    """Reject archives over the configured limits, return warnings for large ones"""
+    warnings = []
+
+    if inventory['source_files'] == 0:
+        raise ArchiveRejected("No C/C++ source files found in the uploaded archive")
+
+    if inventory['source_bytes'] > MAX_UNCOMPRESSED_BYTES:
+        raise ArchiveRejected(
+            f"Source files expand to {inventory['source_bytes']} bytes, limit is {MAX_UNCOMPRESSED_BYTES}"
+        )
+
+    # Only members we extract matter; a bomb hidden in an ignored member is never inflated
+    ratio = inventory['source_bytes'] / max(inventory['source_compressed_bytes'], 1)
+    if ratio > MAX_COMPRESSION_RATIO:
+        raise ArchiveRejected(
+            f"Compression ratio {ratio:.0f}:1 exceeds limit {MAX_COMPRESSION_RATIO}:1"
+        )
+
+    if inventory['source_files'] > MAX_SOURCE_FILES:
+        raise ArchiveRejected(
+            f"Archive contains {inventory['source_files']} source files, limit is {MAX_SOURCE_FILES}"
+        )
+
+    if inventory['source_files'] > WARN_SOURCE_FILES:
+        warnings.append(f"Large archive: {inventory['source_files']} source files, analysis may take a while")
+
+    skipped = inventory['members'] - len(inventory['relevant_members'])
+    if skipped:
+        logger.info(f"Skipping {skipped} non-source archive members")
+
+    return warnings
+
+
+def extract_sources(zip_path: str, extract_dir: str, inventory: Dict,
+                    should_stop: Optional[Callable[[], bool]] = None) -> int:
+    """Stream only the relevant members to disk, enforcing declared sizes"""
+    dest = Path(extract_dir)
+    written_total = 0
+
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in inventory['relevant_members']:
+            if should_stop and should_stop():
+                raise AnalysisCancelled()
+            info = zf.getinfo(name)
+            target = dest.joinpath(*_safe_member_path(name).parts)
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            written = 0
+            try:
+                with zf.open(info) as src, open(target, 'wb') as out:
+                    while True:
+                        chunk = src.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        written += len(chunk)
+                        # Central directory sizes can lie; never write more than was declared
+                        if written > info.file_size:
+                            raise ArchiveRejected(f"Member {name} is larger than declared")
+                        out.write(chunk)
+            except zipfile.BadZipFile as e:
+                # zipfile stops at the declared size, so an understated size surfaces as a CRC error
+                raise ArchiveRejected(f"Member {name} is corrupt or larger than declared: {str(e)}")
+            written_total += written
+
+    logger.info(f"Extracted {len(inventory['relevant_members'])} members, {written_total} bytes")
+    return written_total
+
+
+def prepare_extract_dir(analysis_id: str, default_dir: Path) -> Path:
+    """Pick the extraction directory, preferring EXTRACT_TMPFS_DIR when set"""
+    tmpfs_root = os.environ.get('EXTRACT_TMPFS_DIR')
+    if tmpfs_root and Path(tmpfs_root).is_dir():
+        extract_dir = Path(tmpfs_root) / f"misra_{analysis_id}"
+    else:
+        extract_dir = default_dir
+    extract_dir.mkdir(parents=True, exist_ok=True)
+    return extract_dir
+
+
+def cleanup_extract_dir(extract_dir: Path, default_dir: Path):
+    """Remove tmpfs extraction trees so they do not hold on to memory"""
+    if extract_dir != default_dir:
+        shutil.rmtree(extract_dir, ignore_errors=True)
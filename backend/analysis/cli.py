@@ -0,0 +1,218 @@
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from analysis.analyzer import run_analysis
+from analysis.components import (
+    COMPONENT_DETECTION, COMPONENT_WORKERS, DETECTION_MODES, analyze_components, detect_components
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ['json', 'sarif', 'html']
+
+EXIT_OK = 0
+EXIT_THRESHOLD = 1
+EXIT_ERROR = 2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="python -m analysis",
+        description="Run MISRA C:2012 analysis on a source tree without the API server"
+    )
+    parser.add_argument("source_dir", help="Directory containing the C/C++ sources")
+    parser.add_argument("-o", "--output-dir", default="misra_results",
+                        help="Directory where result files are written (default: misra_results)")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=OUTPUT_FORMATS,
+                        help="Output format, may be repeated (default: json and sarif)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of parallel tool jobs (default: CPU count)")
+    parser.add_argument("-x", "--exclude", action="append", default=[], metavar="PATTERN",
+                        help="gitignore-style pattern of paths to skip, may be repeated "
+                             "(in addition to .misraignore files in the tree)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Capture cppcheck per-checker and per-file timings into the results")
+    parser.add_argument("--components", choices=DETECTION_MODES, default=COMPONENT_DETECTION,
+                        help="Split the tree into components: only from a misra-components.json manifest, "
+                             "also guessed from the layout (auto), or never (default: %(default)s)")
+    parser.add_argument("--project-name", default=None,
+                        help="Project name shown in reports (default: source directory name)")
+    parser.add_argument("--max-violations", type=int, default=None,
+                        help="Fail if total violations exceed this number")
+    parser.add_argument("--max-mandatory", type=int, default=None,
+                        help="Fail if Mandatory violations exceed this number")
+    parser.add_argument("--max-required", type=int, default=None,
+                        help="Fail if Required violations exceed this number")
+    parser.add_argument("--max-advisory", type=int, default=None,
+                        help="Fail if Advisory violations exceed this number")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    return parser
+
+
+def write_json_results(results: Dict, json_path: Path):
+    """Write results as JSON, streaming violations one per line"""
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        for key, value in results.items():
+            if key != 'violations':
+                f.write(f'  {json.dumps(key)}: {json.dumps(value)},\n')
+        f.write('  "violations": [')
+        for i, v in enumerate(results.get('violations', [])):
+            f.write(',\n    ' if i else '\n    ')
+            f.write(json.dumps(v))
+        f.write('\n  ]\n}\n')
+
+
+def write_results(results: Dict, output_dir: Path, formats: List[str], project_name: str) -> List[Path]:
+    """Write analysis results in the requested formats"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    if 'json' in formats:
+        json_path = output_dir / "misra_results.json"
+        write_json_results(results, json_path)
+        written.append(json_path)
+
+    if 'sarif' in formats:
+        from report.sarif_generator import generate_sarif_report
+        sarif_path = output_dir / "misra_results.sarif"
+        generate_sarif_report(results, str(sarif_path), project_name)
+        written.append(sarif_path)
+
+    if 'html' in formats:
+        # Jinja2 is only imported when an HTML report is requested to keep startup fast
+        from report.html_generator import generate_html_report
+        html_path = output_dir / "misra_report.html"
+        generate_html_report(results, str(html_path), project_name)
+        written.append(html_path)
+
+    return written
+
+
+def write_component_results(results: Dict, output_dir: Path, formats: List[str], project_name: str) -> List[Path]:
+    """Write per-component results under components/<slug>/ plus a roll-up index"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    links = {}
+
+    for component in results['components']:
+        if component['error']:
+            continue
+        component_dir = output_dir / "components" / component['slug']
+        written.extend(write_results(component, component_dir, formats, f"{project_name} - {component['name']}"))
+        links[component['slug']] = f"components/{component['slug']}/misra_report.html"
+
+    index = {
+        'summary': results['summary'],
+        'resource_breaches': results.get('resource_breaches', []),
+        'components': [
+            {key: value for key, value in component.items() if key != 'violations'}
+            for component in results['components']
+        ]
+    }
+    index_path = output_dir / "misra_index.json"
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    written.append(index_path)
+
+    if 'html' in formats:
+        from report.html_generator import generate_index_report
+        html_path = output_dir / "misra_index.html"
+        generate_index_report(results, str(html_path), project_name, links)
+        written.append(html_path)
+
+    return written
+
+
+def check_thresholds(summary: Dict, args: argparse.Namespace) -> List[str]:
+    """Return a message for every threshold exceeded by the summary"""
+    severity_counts = summary.get('severity_counts', {})
+    limits = [
+        ('total', summary.get('total_violations', 0), args.max_violations),
+        ('mandatory', severity_counts.get('mandatory', 0), args.max_mandatory),
+        ('required', severity_counts.get('required', 0), args.max_required),
+        ('advisory', severity_counts.get('advisory', 0), args.max_advisory),
+    ]
+
+    breaches = []
+    for name, count, limit in limits:
+        if limit is not None and count > limit:
+            breaches.append(f"{name} violations {count} exceed limit {limit}")
+    return breaches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    source_dir = Path(args.source_dir).resolve()
+    if not source_dir.is_dir():
+        logger.error(f"Source directory not found: {source_dir}")
+        return EXIT_ERROR
+
+    formats = args.formats or ['json', 'sarif']
+    project_name = args.project_name or source_dir.name
+
+    try:
+        components = detect_components(str(source_dir), args.exclude, mode=args.components)
+        if components:
+            # Split the job budget between the components analyzed at the same time
+            concurrent = max(1, min(COMPONENT_WORKERS, len(components)))
+            results = analyze_components(str(source_dir), components, jobs=max(1, args.jobs // concurrent),
+                                         exclude=args.exclude, profile=args.profile)
+        else:
+            results = run_analysis(str(source_dir), jobs=max(1, args.jobs), exclude=args.exclude, profile=args.profile)
+    except Exception as e:
+        logger.error(f"Analysis failed: {str(e)}")
+        return EXIT_ERROR
+
+    # A failed write must not be mistaken for exceeded thresholds
+    try:
+        if components:
+            written = write_component_results(results, Path(args.output_dir), formats, project_name)
+        else:
+            written = write_results(results, Path(args.output_dir), formats, project_name)
+    except Exception as e:
+        logger.error(f"Writing results failed: {str(e)}")
+        return EXIT_ERROR
+    for path in written:
+        logger.info(f"Wrote {path}")
+
+    summary = results.get('summary', {})
+    severity_counts = summary.get('severity_counts', {})
+    for component in results.get('components', []):
+        if component['error']:
+            print(f"  {component['name']}: failed ({component['error']})")
+        else:
+            print(f"  {component['name']}: {component['summary'].get('total_violations', 0)} violations")
+    print(
+        f"{summary.get('files_analyzed', 0)} files, "
+        f"{summary.get('total_violations', 0)} violations "
+        f"(mandatory={severity_counts.get('mandatory', 0)}, "
+        f"required={severity_counts.get('required', 0)}, "
+        f"advisory={severity_counts.get('advisory', 0)})"
+    )
+
+    # Incomplete results must not pass the gate
+    tool_errors = results.get('tool_errors', [])
+    for error in tool_errors:
+        logger.error(f"Tool error: {error['tool']}: {error['detail']}")
+    failed_components = [c for c in results.get('components', []) if c['error']]
+    if tool_errors or failed_components:
+        return EXIT_ERROR
+
+    breaches = check_thresholds(summary, args)
+    for breach in breaches:
+        logger.error(f"Threshold exceeded: {breach}")
+
+    return EXIT_THRESHOLD if breaches else EXIT_OK
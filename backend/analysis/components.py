@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from analysis.analyzer import SOURCE_EXTENSIONS, run_analysis
+from analysis.exclusions import IGNORE_FILENAME, PathFilter
+from analysis.limits import AnalysisCancelled, ResourceBudget
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = 'misra-components.json'
+INCLUDE_DIR_NAMES = ('include', 'inc')
+
+# manifest: split only archives that ship a manifest; auto: also guess from the layout; off
+COMPONENT_DETECTION = os.environ.get('COMPONENT_DETECTION', 'manifest')
+DETECTION_MODES = ('manifest', 'auto', 'off')
+COMPONENT_WORKERS = int(os.environ.get('COMPONENT_WORKERS', os.cpu_count() or 1))
+MIN_COMPONENTS = 2
+
+ROOT_COMPONENT = '(root)'
+
+
+def component_slug(name: str) -> str:
+    """File-name and URL safe component identifier"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_.') or 'component'
+
+
+def _has_sources(directory: Path) -> bool:
+    """Whether directory contains a translation unit; headers alone produce no analysis"""
+    for _, _, filenames in os.walk(directory):
+        if any(os.path.splitext(name)[1] in ('.c', '.cpp') for name in filenames):
+            return True
+    return False
+
+
+def _has_include_root(directory: Path) -> bool:
+    return any((directory / name).is_dir() for name in INCLUDE_DIR_NAMES)
+
+
+def _read_manifest(manifest: Path) -> List[Dict]:
+    """Components listed in misra-components.json, paths relative to the manifest"""
+    with open(manifest, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    components = []
+    for entry in data.get('components', []):
+        path = (manifest.parent / entry['path']).resolve()
+        if manifest.parent.resolve() not in path.parents or not path.is_dir():
+            logger.warning(f"Ignoring component outside the archive or missing: {entry['path']}")
+            continue
+        components.append({'name': entry.get('name') or entry['path'], 'path': path})
+    return components
+
+
+def detect_components(source_dir: str, exclude: Optional[List[str]] = None,
+                      mode: Optional[str] = None) -> List[Dict]:
+    """Find independently analyzable components, or [] for a single project.
+
+    A misra-components.json manifest wins. In 'auto' mode, without a manifest,
+    every top-level directory with translation units becomes a component when
+    at least two of them have their own include/ or inc/ directory; include
+    directories themselves never do. A single wrapper directory at the
+    archive root is looked through.
+    """
+    mode = mode or COMPONENT_DETECTION
+    if mode == 'off':
+        return []
+
+    root = Path(source_dir)
+    filters = [PathFilter(exclude, root)] if exclude else []
+    if (root / IGNORE_FILENAME).is_file():
+        filters.append(PathFilter.from_file(root / IGNORE_FILENAME))
+
+    def listing(directory: Path):
+        dirs = sorted(d for d in directory.iterdir()
+                      if d.is_dir() and not any(f.is_excluded(d, True) for f in filters))
+        loose = any(child.is_file() and child.suffix in SOURCE_EXTENSIONS for child in directory.iterdir())
+        return dirs, loose
+
+    base = root
+    dirs, loose = listing(base)
+    if len(dirs) == 1 and not loose and not (base / MANIFEST_FILENAME).is_file():
+        base = dirs[0]
+        dirs, loose = listing(base)
+
+    manifest = base / MANIFEST_FILENAME
+    if manifest.is_file():
+        try:
+            components = _read_manifest(manifest)
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Invalid component manifest {manifest}: {e}")
+            components = []
+    elif mode != 'auto':
+        return []
+    else:
+        source_dirs = [d for d in dirs if d.name not in INCLUDE_DIR_NAMES and _has_sources(d)]
+        if sum(1 for d in source_dirs if _has_include_root(d)) < MIN_COMPONENTS:
+            return []
+        components = [{'name': d.name, 'path': d} for d in source_dirs]
+        if loose:
+            # Exclusion patterns are anchored at the archive root
+            components.append({
+                'name': ROOT_COMPONENT,
+                'path': base,
+                'exclude': [f"/{d.relative_to(root).as_posix()}/" for d in source_dirs],
+                'nested': [f"{d.name}/" for d in source_dirs]
+            })
+
+    if len(components) < MIN_COMPONENTS:
+        return []
+
+    slugs = set()
+    for component in components:
+        slug = base_slug = component_slug(component['name'])
+        suffix = 2
+        while slug in slugs:
+            slug = f"{base_slug}_{suffix}"
+            suffix += 1
+        slugs.add(slug)
+        component['slug'] = slug
+        component['relative_path'] = os.path.relpath(Path(component['path']).resolve(), root.resolve())
+    logger.info(f"Detected {len(components)} components")
+    return components
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """Roll component summaries up into one project summary"""
+    severity_counts = defaultdict(int)
+    rule_counts = defaultdict(int)
+    merged = {
+        'files_analyzed': 0,
+        'lines_analyzed': 0,
+        'total_violations': 0
+    }
+
+    for summary in summaries:
+        for key in merged:
+            merged[key] += summary.get(key, 0)
+        for severity, count in summary.get('severity_counts', {}).items():
+            severity_counts[severity] += count
+        for rc in summary.get('rule_counts', []):
+            rule_counts[(rc['rule'], rc['severity'])] += rc['count']
+
+    merged['severity_counts'] = {
+        'mandatory': severity_counts['mandatory'],
+        'required': severity_counts['required'],
+        'advisory': severity_counts['advisory']
+    }
+    merged['rule_counts'] = [
+        {'rule': rule, 'severity': severity, 'count': count}
+        for (rule, severity), count in sorted(rule_counts.items())
+    ]
+    return merged
+
+
+def analyze_components(source_dir: str, components: List[Dict], jobs: Optional[int] = None,
+                       budget: Optional[ResourceBudget] = None, exclude: Optional[List[str]] = None,
+                       profile: bool = False) -> Dict:
+    """Analyze components concurrently as independent sub-jobs sharing one budget"""
+    budget = budget or ResourceBudget.from_env()
+
+    def analyze_one(component: Dict) -> Dict:
+        result = {
+            'name': component['name'],
+            'slug': component['slug'],
+            'path': component['relative_path'],
+            'violations': [],
+            'summary': {},
+            'tool_errors': [],
+            'error': None
+        }
+        try:
+            component_results = run_analysis(
+                str(component['path']), jobs, budget,
+                (exclude or []) + component.get('exclude', []), profile, root_dir=source_dir
+            )
+            result['violations'] = component_results['violations']
+            result['summary'] = component_results['summary']
+            result['tool_errors'] = component_results['tool_errors']
+            if component.get('nested'):
+                # Other components are analyzed on their own, not skipped
+                result['summary']['excluded_paths'] = [
+                    p for p in result['summary'].get('excluded_paths', []) if p not in component['nested']
+                ]
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Component {component['name']} failed: {str(e)}")
+            result['error'] = str(e)
+        return result
+
+    workers = max(1, min(COMPONENT_WORKERS, len(components)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        component_results = list(executor.map(analyze_one, components))
+
+    if budget.cancelled:
+        raise AnalysisCancelled()
+
+    if all(c['error'] for c in component_results):
+        raise Exception("All components failed: " + "; ".join(
+            f"{c['name']}: {c['error']}" for c in component_results
+        ))
+
+    return {
+        'components': component_results,
+        'summary': merge_summaries([c['summary'] for c in component_results]),
+        'resource_breaches': list(budget.breaches),
+        'tool_errors': [
+            dict(error, component=c['name']) for c in component_results for error in c['tool_errors']
+        ]
+    }
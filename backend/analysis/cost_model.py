@@ -0,0 +1,112 @@
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('source_files', 'header_files', 'source_kb')
+STAGES = ('extract', 'analysis', 'report')
+
+# Fallback coefficients (seconds) used until enough history exists:
+# intercept, per source file, per header file, per KB of source
+DEFAULT_COEFFICIENTS = {
+    'extract': [0.1, 0.001, 0.001, 0.0005],
+    'analysis': [2.0, 0.5, 0.1, 0.01],
+    'report': [0.2, 0.005, 0.005, 0.0005],
+}
+
+# Twice as many samples as coefficients (intercept plus one per feature)
+MIN_SAMPLES = 2 * (len(FEATURES) + 1)
+# Ridge penalty on the standardised feature coefficients
+RIDGE = 0.1
+
+
+def features_from_inventory(inventory: Dict) -> Dict[str, float]:
+    """Derive cost features from the archive central directory.
+
+    Line count and include fan-out are not known before extraction, so
+    source size and header count stand in for them.
+    """
+    return {
+        'source_files': float(inventory.get('source_files', 0)),
+        'header_files': float(inventory.get('header_files', 0)),
+        'source_kb': inventory.get('source_bytes', 0) / 1024.0,
+    }
+
+
+def _nnls(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Non-negative least squares, min ||a x - b|| subject to x >= 0 (Lawson-Hanson)"""
+    n = a.shape[1]
+    passive = np.zeros(n, dtype=bool)
+    x = np.zeros(n)
+    tolerance = 1e-10 * max(1.0, float(np.abs(a).max()))
+
+    for _ in range(3 * n):
+        gradient = a.T @ (b - a @ x)
+        if passive.all() or gradient[~passive].max() <= tolerance:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(a[:, passive], b, rcond=None)[0]
+            if not passive.any() or z[passive].min() > 0:
+                break
+            # Step back to the boundary and release the coefficients that hit zero
+            blocked = passive & (z <= 0)
+            step = np.min(x[blocked] / np.maximum(x[blocked] - z[blocked], tolerance))
+            x = x + step * (z - x)
+            passive &= x > tolerance
+            x[~passive] = 0.0
+        x = z
+    return x
+
+
+class CostModel:
+    def __init__(self):
+        self.coefficients = {stage: list(coef) for stage, coef in DEFAULT_COEFFICIENTS.items()}
+        self.samples = 0
+
+    def fit(self, samples: List[Dict]) -> int:
+        """Fit per-stage non-negative ridge regressions on {'features', 'timings'} samples.
+
+        Features are scaled to unit RMS before the fit so one ridge penalty suits
+        all of them. Coefficients are kept non-negative, so a larger job is never
+        predicted to finish sooner than a smaller one.
+        """
+        usable = [s for s in samples if s.get('features') and s.get('timings')]
+        if len(usable) < MIN_SAMPLES:
+            logger.info(f"Cost model has {len(usable)} samples, keeping default coefficients")
+            return len(usable)
+
+        features = np.array([[float(s['features'].get(f, 0.0)) for f in FEATURES] for s in usable])
+        scale = np.sqrt((features ** 2).mean(axis=0))
+        scale[scale == 0] = 1.0
+        design = np.vstack([
+            np.hstack([np.ones((len(usable), 1)), features / scale]),
+            # Ridge rows penalise the feature coefficients but not the intercept
+            np.hstack([np.zeros((len(FEATURES), 1)), np.sqrt(RIDGE) * np.eye(len(FEATURES))])
+        ])
+
+        for stage in STAGES:
+            targets = np.array([float(s['timings'].get(stage, 0.0)) for s in usable] + [0.0] * len(FEATURES))
+            coefficients = _nnls(design, targets)
+            coefficients[1:] /= scale
+            self.coefficients[stage] = coefficients.tolist()
+
+        self.samples = len(usable)
+        logger.info(f"Cost model trained on {self.samples} analyses")
+        return self.samples
+
+    def predict_stages(self, features: Dict[str, float]) -> Dict[str, float]:
+        """Predict the duration in seconds of each stage"""
+        x = [1.0] + [float(features.get(f, 0.0)) for f in FEATURES]
+        return {
+            stage: max(0.0, sum(c * v for c, v in zip(coef, x)))
+            for stage, coef in self.coefficients.items()
+        }
+
+    def predict(self, features: Dict[str, float]) -> float:
+        """Predict the total duration of an analysis in seconds"""
+        return sum(self.predict_stages(features).values())
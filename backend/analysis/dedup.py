@@ -0,0 +1,143 @@
+import os
+import re
+import hashlib
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*([<"])([^">]+)[">]', re.MULTILINE)
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DuplicateIndex:
+    """Groups translation units that are byte-identical and see identical includes.
+
+    Two files share a group when their content matches and every file in
+    their include closure sits at the same relative location with the same
+    content, so analyzing one of them yields the findings of all of them.
+    """
+
+    def __init__(self, source_dir: Path, files: List[Path], units: List[Path]):
+        self.source_dir = Path(os.path.normpath(source_dir))
+        self.files = files
+        self.units = {Path(os.path.normpath(u)) for u in units}
+        self.digests: Dict[Path, str] = {}
+        self.sizes: Dict[Path, int] = {}
+        self._includes: Dict[Path, List[tuple]] = {}
+        self.closures: Dict[Path, Set[Path]] = {}
+        self.duplicates: Dict[Path, List[Path]] = {}
+        self._build()
+
+    def _resolve(self, includer: Path, kind: str, name: str) -> Optional[Path]:
+        candidates = [self.source_dir / name]
+        if kind == '"':
+            candidates.insert(0, includer.parent / name)
+        for candidate in candidates:
+            candidate = Path(os.path.normpath(candidate))
+            if candidate in self.digests:
+                return candidate
+        return None
+
+    def _parse_includes(self, path: Path) -> List[tuple]:
+        if path not in self._includes:
+            try:
+                text = path.read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                text = ''
+            self._includes[path] = [
+                (name, self._resolve(path, kind, name)) for kind, name in INCLUDE_RE.findall(text)
+            ]
+        return self._includes[path]
+
+    def _context_key(self, path: Path) -> str:
+        """Hash of the file plus its include closure, relative to the file's directory"""
+        closure = {path}
+        missing = set()
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            for name, target in self._parse_includes(current):
+                if target is None:
+                    missing.add(name)
+                elif target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+        self.closures[path] = closure
+
+        entries = sorted(
+            (os.path.relpath(member, path.parent), self.digests[member]) for member in closure
+        )
+        key = hashlib.sha256(repr((entries, sorted(missing))).encode()).hexdigest()
+        return key
+
+    def _build(self):
+        for f in self.files:
+            try:
+                self.digests[Path(os.path.normpath(f))] = file_digest(f)
+                self.sizes[Path(os.path.normpath(f))] = f.stat().st_size
+            except OSError as e:
+                logger.debug(f"Cannot hash {f}: {e}")
+
+        # Only translation units are grouped; headers follow their includers
+        by_content = defaultdict(list)
+        for path, digest in self.digests.items():
+            if path in self.units:
+                by_content[digest].append(path)
+
+        for paths in by_content.values():
+            if len(paths) < 2:
+                continue
+            groups = defaultdict(list)
+            for path in sorted(paths):
+                groups[self._context_key(path)].append(path)
+            for members in groups.values():
+                if len(members) > 1:
+                    self.duplicates[members[0]] = members[1:]
+
+        self.skipped = {dup for dups in self.duplicates.values() for dup in dups}
+        if self.skipped:
+            logger.info(f"Skipping {len(self.skipped)} duplicate files in {len(self.duplicates)} groups")
+
+    def representatives(self, files: List[Path]) -> List[Path]:
+        """Filter a file list down to one path per duplicate group"""
+        return [f for f in files if Path(os.path.normpath(f)) not in self.skipped]
+
+    def fan_out(self, violations: Iterable[Dict]) -> Iterator[Dict]:
+        """Copy findings of representatives (and their includes) to every duplicate path"""
+        if not self.duplicates:
+            yield from violations
+            return
+
+        owners = defaultdict(list)
+        for rep in self.duplicates:
+            for member in self.closures.get(rep, {rep}):
+                owners[member].append(rep)
+
+        for v in violations:
+            yield v
+            path = Path(os.path.normpath(self.source_dir / v['file']))
+            for rep in owners.get(path, []):
+                relative = os.path.relpath(path, rep.parent)
+                for dup in self.duplicates[rep]:
+                    target = Path(os.path.normpath(dup.parent / relative))
+                    if self.digests.get(target) == self.digests[path]:
+                        yield dict(v, file=str(target.relative_to(self.source_dir)))
+
+    def stats(self) -> Dict:
+        """Summary of the work saved by duplicate detection"""
+        return {
+            'groups': len(self.duplicates),
+            'files_skipped': len(self.skipped),
+            'bytes_skipped': sum(self.sizes.get(p, 0) for p in self.skipped)
+        }
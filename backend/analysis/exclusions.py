@@ -0,0 +1,103 @@
+import re
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+IGNORE_FILENAME = '.misraignore'
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate a gitignore-style glob into a regular expression body"""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = glob.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class PathFilter:
+    """Compiled gitignore-style patterns, evaluated relative to a base directory.
+
+    Supports comments, '!' negation (last match wins), trailing '/' for
+    directory-only patterns, leading or inner '/' for anchoring, and '**'.
+    """
+
+    def __init__(self, patterns: List[str], base: Path):
+        self.base = base
+        self.rules = []
+        for raw in patterns:
+            pattern = raw.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern
+            pattern = pattern.lstrip('/')
+            if not pattern:
+                continue
+            prefix = '^' if anchored else '^(?:.*/)?'
+            self.rules.append((re.compile(prefix + _glob_to_regex(pattern) + '$'), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'PathFilter':
+        """Load the ignore file at path, relative to its own directory"""
+        try:
+            lines = path.read_text(encoding='utf-8', errors='ignore').splitlines()
+        except OSError as e:
+            logger.warning(f"Cannot read {path}: {e}")
+            lines = []
+        return cls(lines, path.parent)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def is_excluded(self, path: Path, is_dir: bool) -> bool:
+        """Whether path (under base) is excluded; the last matching rule wins"""
+        try:
+            relative = path.relative_to(self.base).as_posix()
+        except ValueError:
+            return False
+        excluded = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                excluded = not negate
+        return excluded
+
+
+def split_patterns(value: Optional[str]) -> List[str]:
+    """Split a comma- or newline-separated pattern string"""
+    if not value:
+        return []
+    return [p.strip() for p in re.split(r'[,\n]', value) if p.strip()]
@@ -0,0 +1,198 @@
+import os
+import sys
+import shutil
+import signal
+import subprocess
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; limits other than concurrency are skipped
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ERROR_MARKERS = ('bad_alloc', 'out of memory', 'Cannot allocate memory', 'MemoryError')
+
+PRLIMIT = shutil.which('prlimit')
+
+# Used where util-linux prlimit is unavailable: sets the limits, then execs the tool
+RLIMIT_LAUNCHER = (
+    "import os, sys, resource\n"
+    "memory, cpu = int(sys.argv[1]), int(sys.argv[2])\n"
+    "if memory: resource.setrlimit(resource.RLIMIT_AS, (memory, memory))\n"
+    "if cpu: resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))\n"
+    "os.execvp(sys.argv[4], sys.argv[4:])\n"
+)
+
+
+class AnalysisCancelled(Exception):
+    """Raised when a job is cancelled while its tools are running"""
+
+
+class ResourceBudget:
+    """Per-job limits applied to every tool subprocess the analyzer launches"""
+
+    def __init__(self, max_memory_mb: int = 0, max_cpu_seconds: int = 0, nice: int = 0,
+                 max_processes: int = 0):
+        self.max_memory_mb = max_memory_mb
+        self.max_cpu_seconds = max_cpu_seconds
+        self.nice = nice
+        self.max_processes = max_processes
+        self.breaches: List[Dict] = []
+        self.cancelled = False
+        self._slots = threading.BoundedSemaphore(max_processes) if max_processes > 0 else None
+        self._lock = threading.Lock()
+        self._procs = set()
+
+    @classmethod
+    def from_env(cls) -> 'ResourceBudget':
+        """Build a budget from TOOL_* environment variables (0 disables a limit)"""
+        return cls(
+            max_memory_mb=int(os.environ.get('TOOL_MAX_MEMORY_MB', 4096)),
+            max_cpu_seconds=int(os.environ.get('TOOL_MAX_CPU_SECONDS', 1800)),
+            nice=int(os.environ.get('TOOL_NICE', 10)),
+            max_processes=int(os.environ.get('TOOL_MAX_PROCESSES', os.cpu_count() or 1))
+        )
+
+    def _limit_prefix(self) -> List[str]:
+        """Command prefix that applies the limits to the tool.
+
+        The limits are set by wrapper commands that exec the tool rather than
+        by preexec_fn, which is unsafe while other threads are running and
+        tools are launched from several thread pools.
+        """
+        if os.name != 'posix':
+            return []
+        prefix = []
+        memory = self.max_memory_mb * 1024 * 1024 if resource is not None else 0
+        cpu = self.max_cpu_seconds if resource is not None else 0
+        if memory or cpu:
+            if PRLIMIT:
+                # SIGXCPU at the soft limit, SIGKILL shortly after at the hard limit
+                prefix.append(PRLIMIT)
+                if memory:
+                    prefix.append(f"--as={memory}")
+                if cpu:
+                    prefix.append(f"--cpu={cpu}:{cpu + 5}")
+                prefix.append('--')
+            else:
+                prefix += [sys.executable, '-c', RLIMIT_LAUNCHER, str(memory), str(cpu), '--']
+        if self.nice:
+            prefix += ['nice', '-n', str(self.nice)]
+        return prefix
+
+    def _record(self, tool: str, target: str, limit: str, detail: str):
+        logger.warning(f"{tool} on {target}: {detail}")
+        with self._lock:
+            self.breaches.append({'tool': tool, 'target': target, 'limit': limit, 'detail': detail})
+
+    def _classify(self, result: subprocess.CompletedProcess) -> Optional[tuple]:
+        """Map an abnormal exit to the limit that caused it, or to a generic crash"""
+        if result.returncode == -signal.SIGXCPU:
+            return 'cpu', f"CPU time limit of {self.max_cpu_seconds}s reached"
+        output = result.stderr or ''
+        if self.max_memory_mb and result.returncode != 0 and \
+                any(marker in output for marker in MEMORY_ERROR_MARKERS):
+            return 'memory', f"address space limit of {self.max_memory_mb} MB reached"
+        if result.returncode < 0:
+            # e.g. SIGKILL from the kernel OOM killer, or a crash in the tool itself
+            try:
+                name = signal.Signals(-result.returncode).name
+            except ValueError:
+                name = f"signal {-result.returncode}"
+            return 'crashed', f"killed by {name}"
+        return None
+
+    def _kill(self, proc: subprocess.Popen):
+        """Kill a tool and any children it spawned"""
+        try:
+            if os.name == 'posix':
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def cancel(self):
+        """Stop launching tools and kill the ones currently running"""
+        with self._lock:
+            self.cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            self._kill(proc)
+
+    def _stream(self, proc: subprocess.Popen, line_callback: Callable[[str], None], timeout: int) -> str:
+        """Feed merged output to line_callback as it is produced, enforcing the timeout"""
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self._kill(proc)
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        output = []
+        try:
+            for line in proc.stdout:
+                output.append(line)
+                line_callback(line)
+            proc.wait()
+        finally:
+            timer.cancel()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        return ''.join(output)
+
+    def run(self, cmd: List[str], tool: str, target: str, timeout: int,
+            line_callback: Optional[Callable[[str], None]] = None) -> Optional[subprocess.CompletedProcess]:
+        """Run a tool under this budget; returns None and records a breach on timeout.
+
+        With line_callback, stderr is merged into stdout and each line is
+        passed to the callback as soon as the tool prints it.
+        """
+        if self._slots:
+            self._slots.acquire()
+        try:
+            # Checked here because the wrapper commands would hide a missing tool
+            if shutil.which(cmd[0]) is None:
+                raise FileNotFoundError(f"{cmd[0]} not found on PATH")
+            with self._lock:
+                if self.cancelled:
+                    raise AnalysisCancelled()
+                proc = subprocess.Popen(
+                    self._limit_prefix() + cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT if line_callback else subprocess.PIPE,
+                    text=True,
+                    start_new_session=os.name == 'posix'
+                )
+                self._procs.add(proc)
+            try:
+                if line_callback:
+                    stdout = stderr = self._stream(proc, line_callback, timeout)
+                else:
+                    stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._kill(proc)
+                proc.communicate()
+                self._record(tool, target, 'time', f"wall-clock timeout of {timeout}s reached")
+                return None
+            finally:
+                with self._lock:
+                    self._procs.discard(proc)
+        finally:
+            if self._slots:
+                self._slots.release()
+
+        if self.cancelled:
+            raise AnalysisCancelled()
+
+        result = subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+        breach = self._classify(result)
+        if breach:
+            self._record(tool, target, *breach)
+        return result
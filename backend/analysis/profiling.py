@@ -0,0 +1,107 @@
+import os
+import re
+import time
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SHOWTIME_MODE = os.environ.get('CPPCHECK_SHOWTIME', 'summary')
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 20))
+
+# "CheckOther::checkRedundantAssignment: 0.012s (avg. 0.0004s - 30 result(s))"
+CHECKER_RE = re.compile(r'^(?P<name>[^:\s][^\n]*?): (?P<total>[\d.]+)s \(avg\. [\d.]+s - (?P<calls>\d+) result\(s\)\)')
+# "Checking src/main.c ..." / per-configuration passes "Checking src/main.c: DEBUG=1..."
+CHECKING_RE = re.compile(r'^Checking (?P<file>.+?)(?:: .*?\.\.\.| \.\.\.)\s*$')
+# "Check time: src/main.c: 0.53s" (cppcheck --showtime=file-total)
+CHECK_TIME_RE = re.compile(r'^Check time: (?P<file>.+): (?P<seconds>[\d.]+)s')
+
+
+class CppcheckProfiler:
+    """Builds a per-checker and per-file timing profile from cppcheck output.
+
+    Checker timings come from --showtime lines. File timings come from
+    'Check time' lines when cppcheck prints them, and otherwise from the
+    wall-clock gaps between 'Checking <file> ...' progress lines (including
+    per-configuration passes), which is exact with a single job and
+    approximate with -j.
+    """
+
+    def __init__(self, source_dir: Path, mode: str = SHOWTIME_MODE):
+        self.source_dir = source_dir
+        self.mode = mode
+        self.started = time.monotonic()
+        self.checkers = defaultdict(lambda: {'seconds': 0.0, 'calls': 0})
+        self.measured_files = defaultdict(float)
+        self.reported_files = {}
+        self._current = None
+        self._current_start = None
+        self.finished = None
+
+    def _relative(self, file_path: str) -> str:
+        path = Path(file_path)
+        return str(path.relative_to(self.source_dir)) if self.source_dir in path.parents else file_path
+
+    def _close_current(self, now: float):
+        if self._current is not None:
+            self.measured_files[self._current] += now - self._current_start
+            self._current = None
+
+    def feed(self, line: str):
+        """Consume one line of cppcheck output"""
+        line = line.rstrip('\n')
+        now = time.monotonic()
+
+        match = CHECKING_RE.match(line)
+        if match:
+            self._close_current(now)
+            self._current = self._relative(match.group('file'))
+            self._current_start = now
+            return
+
+        match = CHECK_TIME_RE.match(line)
+        if match:
+            self.reported_files[self._relative(match.group('file'))] = float(match.group('seconds'))
+            return
+
+        match = CHECKER_RE.match(line)
+        if match:
+            # The first timing line also marks the end of the last file's checks
+            self._close_current(now)
+            checker = self.checkers[match.group('name').strip()]
+            checker['seconds'] += float(match.group('total'))
+            checker['calls'] += int(match.group('calls'))
+
+    def finish(self):
+        now = time.monotonic()
+        self._close_current(now)
+        self.finished = now
+
+    def profile(self, top_n: Optional[int] = None) -> Dict:
+        """Structured profile with the top-N slowest checkers and files"""
+        if self.finished is None:
+            self.finish()
+        top_n = top_n or PROFILE_TOP_N
+        files = self.reported_files or self.measured_files
+
+        checkers = sorted(
+            ({'name': name, 'seconds': round(data['seconds'], 4), 'calls': data['calls']}
+             for name, data in self.checkers.items()),
+            key=lambda c: c['seconds'], reverse=True
+        )
+        slowest_files = sorted(
+            ({'file': name, 'seconds': round(seconds, 4)} for name, seconds in files.items()),
+            key=lambda f: f['seconds'], reverse=True
+        )
+
+        return {
+            'showtime': self.mode,
+            'wall_seconds': round(self.finished - self.started, 4),
+            'file_timing_source': 'cppcheck' if self.reported_files else 'progress',
+            'checkers_profiled': len(checkers),
+            'files_profiled': len(slowest_files),
+            'top_checkers': checkers[:top_n],
+            'top_files': slowest_files[:top_n]
+        }
@@ -0,0 +1,109 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('fifo', 'sjf')
+
+
+class QueuedJob:
+    def __init__(self, job_id: str, estimate: float, factory: Callable[[], Awaitable]):
+        self.job_id = job_id
+        self.estimate = estimate
+        self.factory = factory
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.task = None
+
+
+class AnalysisQueue:
+    """Bounded-concurrency job queue with FIFO or shortest-job-first ordering.
+
+    Under 'sjf' a job's priority is its estimated duration minus
+    aging * seconds waited, so long jobs keep moving forward and cannot
+    starve behind a steady stream of short ones.
+    """
+
+    def __init__(self, max_concurrent: int, policy: str = 'fifo', aging: float = 1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.max_concurrent = max(1, max_concurrent)
+        self.policy = policy
+        self.aging = aging
+        self.pending: Dict[str, QueuedJob] = {}
+        self.running: Dict[str, QueuedJob] = {}
+
+    def submit(self, job_id: str, estimate: float, factory: Callable[[], Awaitable]):
+        """Queue a job; factory is called to create its coroutine when it starts"""
+        self.pending[job_id] = QueuedJob(job_id, estimate, factory)
+        self._dispatch()
+
+    def _priority(self, job: QueuedJob, now: float) -> float:
+        if self.policy == 'sjf':
+            return job.estimate - self.aging * (now - job.enqueued_at)
+        return job.enqueued_at
+
+    def _ordered_pending(self, now: float) -> List[QueuedJob]:
+        return sorted(self.pending.values(), key=lambda job: (self._priority(job, now), job.enqueued_at))
+
+    def _dispatch(self):
+        while len(self.running) < self.max_concurrent and self.pending:
+            job = self._ordered_pending(time.monotonic())[0]
+            del self.pending[job.job_id]
+            job.started_at = time.monotonic()
+            self.running[job.job_id] = job
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: QueuedJob):
+        try:
+            await job.factory()
+        except Exception as e:
+            logger.error(f"Queued job {job.job_id} failed: {str(e)}")
+        finally:
+            self.running.pop(job.job_id, None)
+            self._dispatch()
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Drop a job from the queue and free its slot at once.
+
+        A running job's coroutine is left to unwind on its own (its tools are
+        killed separately) so that cleanup never races with extraction.
+        Returns the state the job was in, or None if it is unknown.
+        """
+        if self.pending.pop(job_id, None):
+            return 'pending'
+        if self.running.pop(job_id, None):
+            self._dispatch()
+            return 'running'
+        return None
+
+    def snapshot(self, job_id: str) -> Optional[Dict]:
+        """Return queue position and estimated seconds until completion"""
+        now = time.monotonic()
+
+        if job_id in self.running:
+            job = self.running[job_id]
+            return {
+                'queue_position': 0,
+                'eta_seconds': max(job.estimate - (now - job.started_at), 0.0)
+            }
+
+        if job_id not in self.pending:
+            return None
+
+        # Simulate the worker slots draining in the current policy order
+        slots = [max(job.estimate - (now - job.started_at), 0.0) for job in self.running.values()]
+        slots += [0.0] * (self.max_concurrent - len(slots))
+        heapq.heapify(slots)
+
+        for position, job in enumerate(self._ordered_pending(now), start=1):
+            start = heapq.heappop(slots)
+            finish = start + job.estimate
+            if job.job_id == job_id:
+                return {'queue_position': position, 'eta_seconds': finish}
+            heapq.heappush(slots, finish)
+
+        return None
@@ -0,0 +1,131 @@
+import os
+import json
+import sqlite3
+import tempfile
+import weakref
+import logging
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+SPILL_THRESHOLD = int(os.environ.get('VIOLATION_SPILL_THRESHOLD', 200000))
+SPILL_DIR = os.environ.get('VIOLATION_SPILL_DIR') or None
+
+BATCH_SIZE = 10000
+
+
+def _remove_spill_file(conn: sqlite3.Connection, path: str):
+    conn.close()
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class ViolationStore:
+    """Deduplicating violation container that spills to SQLite when it grows large.
+
+    Below the threshold violations live in a list. Above it they are moved to
+    a temporary SQLite database, so deduplication, sorting by file/line and
+    iteration run with bounded memory. Iteration always yields violations
+    sorted by (file, line), keeping the first occurrence of each
+    (file, line, rule) key in insertion order.
+    """
+
+    def __init__(self, threshold: Optional[int] = None):
+        self.threshold = SPILL_THRESHOLD if threshold is None else threshold
+        self._items = []
+        self._seen = set()
+        self._conn = None
+        self._pending = []
+        self._count = 0
+        self._finalizer = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._conn is not None
+
+    def _spill(self):
+        fd, path = tempfile.mkstemp(prefix="misra_violations_", suffix=".sqlite", dir=SPILL_DIR)
+        os.close(fd)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE violations ("
+            "seq INTEGER PRIMARY KEY, file TEXT, line INTEGER, rule TEXT, data TEXT, "
+            "UNIQUE (file, line, rule))"
+        )
+        self._conn = conn
+        self._finalizer = weakref.finalize(self, _remove_spill_file, conn, path)
+        logger.info(f"Violation count exceeded {self.threshold}, spilling to {path}")
+
+        self._pending = self._items
+        self._items = []
+        self._seen = set()
+        self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO violations (file, line, rule, data) VALUES (?, ?, ?, ?)",
+            ((v['file'], v['line'], v['rule'], json.dumps(v)) for v in self._pending)
+        )
+        self._conn.commit()
+        self._count += self._conn.total_changes - before
+        self._pending = []
+
+    def add(self, violation: Dict):
+        if self._conn is not None:
+            self._pending.append(violation)
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+            return
+
+        key = (violation['file'], violation['line'], violation['rule'])
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self._items.append(violation)
+        if len(self._items) > self.threshold:
+            self._spill()
+
+    def extend(self, violations: Iterable[Dict]):
+        for v in violations:
+            self.add(v)
+
+    def __len__(self) -> int:
+        if self._conn is not None:
+            self._flush()
+            return self._count
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._conn is None:
+            self._items.sort(key=lambda x: (x['file'], x['line']))
+            return iter(self._items)
+        self._flush()
+        return self._iter_spilled()
+
+    def _iter_spilled(self) -> Iterator[Dict]:
+        cursor = self._conn.execute("SELECT data FROM violations ORDER BY file, line, seq")
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def result(self) -> Iterable[Dict]:
+        """Sorted violations: a plain list in memory mode, the store itself once spilled"""
+        if self._conn is None:
+            return list(self)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_file_line ON violations (file, line, seq)")
+        return self
+
+    def close(self):
+        """Delete the spill file, if any"""
+        if self._finalizer:
+            self._finalizer()
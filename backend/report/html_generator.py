@@ -1,8 +1,14 @@
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from datetime import datetime
-from typing import Dict
-from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from itertools import groupby
+
+
+def _group_by_file(violations: Iterable[Dict]) -> Iterator[Tuple[str, List[Dict]]]:
+    """Group violations already sorted by file, holding one file's findings at a time"""
+    for file_name, group in groupby(violations, key=lambda v: v['file']):
+        yield file_name, list(group)
 
 
 def generate_html_report(results: Dict, output_path: str, project_name: str):
@@ -15,20 +21,34 @@ def generate_html_report(results: Dict, output_path: str, project_name: str):
     violations = results.get('violations', [])
     summary = results.get('summary', {})
     
-    file_violations = defaultdict(list)
-    for v in violations:
-        file_violations[v['file']].append(v)
-    
     context = {
         'project_name': project_name,
         'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'summary': summary,
         'file_stats': summary.get('file_stats', {}),
-        'file_violations': dict(file_violations),
-        'all_files': sorted(file_violations.keys())
+        'file_groups': _group_by_file(violations)
     }
     
-    html_content = template.render(**context)
+    # Streamed so that large result sets are never rendered into one string
+    with open(output_path, 'w', encoding='utf-8') as f:
+        template.stream(**context).dump(f)
+
+
+def generate_index_report(results: Dict, output_path: str, project_name: str,
+                          links: Optional[Dict[str, str]] = None):
+    """Generate the component index page of a multi-component analysis"""
+    
+    template_dir = Path(__file__).parent / "templates"
+    env = Environment(loader=FileSystemLoader(str(template_dir)))
+    template = env.get_template("misra_index.html.j2")
+    
+    context = {
+        'project_name': project_name,
+        'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'summary': results.get('summary', {}),
+        'components': results.get('components', []),
+        'links': links or {}
+    }
     
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        template.stream(**context).dump(f)
@@ -0,0 +1,68 @@
+import json
+from typing import Dict
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+SARIF_LEVELS = {
+    'Mandatory': 'error',
+    'Required': 'warning',
+    'Advisory': 'note'
+}
+
+
+def _sarif_result(v: Dict) -> Dict:
+    location = {
+        'physicalLocation': {
+            'artifactLocation': {'uri': v['file']}
+        }
+    }
+    if v.get('line', 0) > 0:
+        location['physicalLocation']['region'] = {'startLine': v['line']}
+
+    return {
+        'ruleId': v['rule'],
+        'level': SARIF_LEVELS.get(v['severity'], 'note'),
+        'message': {'text': v['message']},
+        'locations': [location],
+        'properties': {
+            'severity': v['severity'],
+            'tool': v.get('tool'),
+            'type': v.get('type')
+        }
+    }
+
+
+def generate_sarif_report(results: Dict, output_path: str, project_name: str):
+    """Generate SARIF 2.1.0 report for CI code-scanning integrations.
+
+    Results are written one at a time so large result sets are never held
+    as a single document; the rule table is emitted after them.
+    """
+
+    violations = results.get('violations', [])
+    rules = {}
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "$schema": %s,\n  "version": "2.1.0",\n  "runs": [{\n' % json.dumps(SARIF_SCHEMA))
+        f.write('    "automationDetails": %s,\n' % json.dumps({'id': project_name}))
+        f.write('    "results": [')
+
+        for i, v in enumerate(violations):
+            if v['rule'] not in rules:
+                rules[v['rule']] = {
+                    'id': v['rule'],
+                    'shortDescription': {'text': v.get('description', v['rule'])},
+                    'help': {'text': v.get('solution', '')}
+                }
+            f.write(',\n      ' if i else '\n      ')
+            f.write(json.dumps(_sarif_result(v)))
+
+        tool = {
+            'driver': {
+                'name': 'MISRA Analyzer',
+                'version': '1.0',
+                'rules': list(rules.values())
+            }
+        }
+        f.write('\n    ],\n    "tool": %s\n  }]\n}\n' % json.dumps(tool))
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
+from fastapi import FastAPI, APIRouter, UploadFile, File, Form, HTTPException, Query
 from fastapi.responses import FileResponse, HTMLResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -9,12 +9,22 @@ from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 import shutil
 import asyncio
+import time
 
 from analysis.analyzer import run_analysis
-from report.html_generator import generate_html_report
+from analysis.archive import (
+    ArchiveRejected, inspect_archive, check_archive, extract_sources,
+    prepare_extract_dir, cleanup_extract_dir
+)
+from analysis.cost_model import CostModel, features_from_inventory
+from analysis.scheduler import AnalysisQueue
+from analysis.limits import AnalysisCancelled, ResourceBudget
+from analysis.exclusions import split_patterns
+from analysis.components import detect_components, analyze_components
+from report.html_generator import generate_html_report, generate_index_report
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -31,19 +41,40 @@ OUTPUT_DIR = ROOT_DIR / "output" / "reports"
 UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
 OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
 
+cost_model = CostModel()
+analysis_queue = AnalysisQueue(
+    max_concurrent=int(os.environ.get('MAX_CONCURRENT_ANALYSES', os.cpu_count() or 1)),
+    policy=os.environ.get('SCHEDULING_POLICY', 'fifo'),
+    aging=float(os.environ.get('SCHEDULING_AGING', 1.0))
+)
+active_budgets = {}
+
 
 class AnalysisStatus(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
     id: str
-    status: str  # pending, running, completed, failed
+    status: str  # pending, running, completed, failed, cancelled
     filename: str
+    project: Optional[str] = None
+    exclude_patterns: List[str] = []
     created_at: datetime
     completed_at: Optional[datetime] = None
     report_path: Optional[str] = None
     error: Optional[str] = None
     total_violations: Optional[int] = None
     files_analyzed: Optional[int] = None
+    excluded_paths: Optional[int] = None
+    source_files: Optional[int] = None
+    extracted_bytes: Optional[int] = None
+    warnings: List[str] = []
+    estimated_seconds: Optional[float] = None
+    queue_position: Optional[int] = None
+    eta: Optional[datetime] = None
+    resource_breaches: List[dict] = []
+    profile: Optional[dict] = None
+    tool_errors: List[dict] = []
+    components: Optional[List[dict]] = None
 
 
 class AnalysisResponse(BaseModel):
@@ -52,18 +83,51 @@ class AnalysisResponse(BaseModel):
     message: str
 
 
+class RuleCount(BaseModel):
+    rule: str
+    severity: str
+    count: int
+
+
+class TrendPoint(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
+    day: str
+    analysis_id: str
+    analyses: int
+    total_violations: int
+    severity_counts: dict
+    rule_counts: List[RuleCount]
+
+
+class ProjectTrend(BaseModel):
+    project: str
+    points: List[TrendPoint]
+
+
 @api_router.get("/")
 async def root():
     return {"message": "MISRA C Analysis API", "version": "1.0"}
 
 
 @api_router.post("/upload", response_model=AnalysisResponse)
-async def upload_code(file: UploadFile = File(...)):
+async def upload_code(
+    file: UploadFile = File(...),
+    project: Optional[str] = Form(None),
+    exclude: Optional[str] = Form(None),
+    profile: bool = Form(False)
+):
     """Upload C/C++ source code ZIP file for MISRA analysis"""
     
     if not file.filename.endswith('.zip'):
         raise HTTPException(status_code=400, detail="Only ZIP files are accepted")
     
+    # Blank names fall back to the file name; '/' would make the trend URL unreachable
+    project = (project or '').strip()[:100] or Path(file.filename).stem.strip()[:100]
+    if not project or '/' in project:
+        raise HTTPException(status_code=400, detail="Project name must not be empty or contain '/'")
+    exclude_patterns = split_patterns(exclude)
+    
     analysis_id = str(uuid.uuid4())
     upload_path = UPLOAD_DIR / analysis_id
     upload_path.mkdir(exist_ok=True)
@@ -76,21 +140,43 @@ async def upload_code(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
+    try:
+        inventory = await asyncio.to_thread(inspect_archive, str(zip_path))
+        warnings = check_archive(inventory)
+    except ArchiveRejected as e:
+        shutil.rmtree(upload_path, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    features = features_from_inventory(inventory)
+    estimated_seconds = cost_model.predict(features)
+    
     analysis_doc = {
         "id": analysis_id,
         "status": "pending",
         "filename": file.filename,
+        "project": project,
+        "exclude_patterns": exclude_patterns,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "completed_at": None,
         "report_path": None,
         "error": None,
         "total_violations": None,
-        "files_analyzed": None
+        "files_analyzed": None,
+        "source_files": inventory["source_files"],
+        "extracted_bytes": None,
+        "warnings": warnings,
+        "features": features,
+        "estimated_seconds": estimated_seconds,
+        "timings": None
     }
     
     await db.analyses.insert_one(analysis_doc)
     
-    asyncio.create_task(process_analysis(analysis_id, str(zip_path), file.filename))
+    analysis_queue.submit(
+        analysis_id,
+        estimated_seconds,
+        lambda: process_analysis(analysis_id, str(zip_path), file.filename, project, inventory, exclude_patterns, profile)
+    )
     
     return AnalysisResponse(
         analysis_id=analysis_id,
@@ -99,49 +185,182 @@ async def upload_code(file: UploadFile = File(...)):
     )
 
 
-async def process_analysis(analysis_id: str, zip_path: str, filename: str):
+async def process_analysis(analysis_id: str, zip_path: str, filename: str, project: str, inventory: dict,
+                           exclude_patterns: List[str], profile: bool = False):
     """Background task to process analysis"""
+    default_extract_dir = UPLOAD_DIR / analysis_id / "extracted"
+    extract_dir = default_extract_dir
+    timings = {}
+    budget = ResourceBudget.from_env()
+    active_budgets[analysis_id] = budget
     try:
-        await db.analyses.update_one(
-            {"id": analysis_id},
+        started = await db.analyses.update_one(
+            {"id": analysis_id, "status": "pending"},
             {"$set": {"status": "running"}}
         )
+        if started.modified_count == 0:
+            logging.info(f"Analysis cancelled before it started: {analysis_id}")
+            return
         
-        extract_dir = UPLOAD_DIR / analysis_id / "extracted"
-        extract_dir.mkdir(exist_ok=True)
+        extract_dir = prepare_extract_dir(analysis_id, default_extract_dir)
         
-        shutil.unpack_archive(zip_path, extract_dir)
+        stage_start = time.perf_counter()
+        extracted_bytes = await asyncio.get_event_loop().run_in_executor(
+            None, extract_sources, zip_path, str(extract_dir), inventory, lambda: budget.cancelled
+        )
+        timings["extract"] = time.perf_counter() - stage_start
+        await db.analyses.update_one(
+            {"id": analysis_id},
+            {"$set": {"extracted_bytes": extracted_bytes}}
+        )
         
-        results = await asyncio.get_event_loop().run_in_executor(
-            None, run_analysis, str(extract_dir)
+        stage_start = time.perf_counter()
+        components = await asyncio.get_event_loop().run_in_executor(
+            None, detect_components, str(extract_dir), exclude_patterns
         )
+        if components:
+            results = await asyncio.get_event_loop().run_in_executor(
+                None, analyze_components, str(extract_dir), components, None, budget, exclude_patterns, profile
+            )
+        else:
+            results = await asyncio.get_event_loop().run_in_executor(
+                None, run_analysis, str(extract_dir), None, budget, exclude_patterns, profile
+            )
+        timings["analysis"] = time.perf_counter() - stage_start
+        
+        if budget.cancelled:
+            raise AnalysisCancelled()
         
         report_filename = f"misra_report_{analysis_id}.html"
         report_path = OUTPUT_DIR / report_filename
         
-        generate_html_report(results, str(report_path), filename)
+        stage_start = time.perf_counter()
+        if components:
+            component_docs = await asyncio.get_event_loop().run_in_executor(
+                None, write_component_reports, analysis_id, results, report_path, filename
+            )
+        else:
+            component_docs = None
+            # Rendering can stream millions of spilled violations; keep it off the event loop
+            await asyncio.get_event_loop().run_in_executor(
+                None, generate_html_report, results, str(report_path), filename
+            )
+        timings["report"] = time.perf_counter() - stage_start
         
-        await db.analyses.update_one(
-            {"id": analysis_id},
+        summary = results.get("summary", {})
+        if components:
+            excluded_paths = sum(len(c["summary"].get("excluded_paths", [])) for c in results["components"])
+        else:
+            excluded_paths = len(summary.get("excluded_paths", []))
+        
+        completed_at = datetime.now(timezone.utc)
+        completed = await db.analyses.update_one(
+            {"id": analysis_id, "status": "running"},
             {"$set": {
                 "status": "completed",
-                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "completed_at": completed_at.isoformat(),
                 "report_path": str(report_path),
-                "total_violations": results.get("summary", {}).get("total_violations", 0),
-                "files_analyzed": results.get("summary", {}).get("files_analyzed", 0)
+                "total_violations": summary.get("total_violations", 0),
+                "files_analyzed": summary.get("files_analyzed", 0),
+                "excluded_paths": excluded_paths,
+                "timings": timings,
+                "resource_breaches": results.get("resource_breaches", []),
+                "tool_errors": results.get("tool_errors", []),
+                "profile": summary.get("profile"),
+                "components": component_docs
             }}
         )
         
+        if completed.modified_count == 0:
+            # Cancelled while the reports were being written: keep it out of trends and the cost model
+            logging.info(f"Analysis cancelled: {analysis_id}")
+            report_paths = [report_path] + [Path(c["report_path"]) for c in component_docs or [] if c["report_path"]]
+            for path in report_paths:
+                path.unlink(missing_ok=True)
+            return
+        
+        await update_violation_rollup(project, completed_at, analysis_id, summary)
+        await train_cost_model()
+        
+    except AnalysisCancelled:
+        logging.info(f"Analysis cancelled: {analysis_id}")
     except Exception as e:
         logging.error(f"Analysis failed for {analysis_id}: {str(e)}")
         await db.analyses.update_one(
-            {"id": analysis_id},
+            {"id": analysis_id, "status": "running"},
             {"$set": {
                 "status": "failed",
                 "completed_at": datetime.now(timezone.utc).isoformat(),
                 "error": str(e)
             }}
         )
+    finally:
+        active_budgets.pop(analysis_id, None)
+        if budget.cancelled:
+            await asyncio.to_thread(shutil.rmtree, extract_dir, True)
+        else:
+            cleanup_extract_dir(extract_dir, default_extract_dir)
+
+
+def write_component_reports(analysis_id: str, results: dict, index_path: Path, filename: str) -> List[dict]:
+    """Write one HTML report per component plus the index, return the component documents"""
+    component_docs = []
+    links = {}
+    for component in results["components"]:
+        report_path = None
+        if not component["error"]:
+            report_path = OUTPUT_DIR / f"misra_report_{analysis_id}_{component['slug']}.html"
+            generate_html_report(component, str(report_path), f"{filename} - {component['name']}")
+            links[component["slug"]] = f"/api/report/{analysis_id}/components/{component['slug']}"
+        component_docs.append({
+            "name": component["name"],
+            "slug": component["slug"],
+            "path": component["path"],
+            "total_violations": component["summary"].get("total_violations", 0),
+            "files_analyzed": component["summary"].get("files_analyzed", 0),
+            "severity_counts": component["summary"].get("severity_counts", {}),
+            "profile": component["summary"].get("profile"),
+            "error": component["error"],
+            "report_path": str(report_path) if report_path else None
+        })
+    generate_index_report(results, str(index_path), filename, links)
+    return component_docs
+
+
+async def update_violation_rollup(project: str, completed_at: datetime, analysis_id: str, summary: dict):
+    """Record the latest analysis of the day in the project's daily rollup"""
+    await db.violation_rollups.update_one(
+        {"project": project, "day": completed_at.date().isoformat()},
+        {
+            "$set": {
+                "analysis_id": analysis_id,
+                "updated_at": completed_at.isoformat(),
+                "total_violations": summary.get("total_violations", 0),
+                "severity_counts": summary.get("severity_counts", {}),
+                "rule_counts": summary.get("rule_counts", [])
+            },
+            "$inc": {"analyses": 1}
+        },
+        upsert=True
+    )
+
+
+async def train_cost_model():
+    """Refit the cost model on recent completed analyses"""
+    samples = await db.analyses.find(
+        {"status": "completed", "timings": {"$ne": None}},
+        {"_id": 0, "features": 1, "timings": 1}
+    ).sort("completed_at", -1).limit(500).to_list(500)
+    cost_model.fit(samples)
+
+
+def add_queue_estimate(analysis: dict) -> dict:
+    """Attach live queue position and ETA to pending or running analyses"""
+    snapshot = analysis_queue.snapshot(analysis["id"])
+    if snapshot:
+        analysis["queue_position"] = snapshot["queue_position"]
+        analysis["eta"] = datetime.now(timezone.utc) + timedelta(seconds=snapshot["eta_seconds"])
+    return analysis
 
 
 @api_router.get("/analysis/{analysis_id}", response_model=AnalysisStatus)
@@ -157,7 +376,40 @@ async def get_analysis_status(analysis_id: str):
     if analysis.get("completed_at") and isinstance(analysis["completed_at"], str):
         analysis["completed_at"] = datetime.fromisoformat(analysis["completed_at"])
     
-    return AnalysisStatus(**analysis)
+    return AnalysisStatus(**add_queue_estimate(analysis))
+
+
+@api_router.delete("/analysis/{analysis_id}", response_model=AnalysisResponse)
+async def cancel_analysis(analysis_id: str):
+    """Cancel a pending or running analysis"""
+    analysis = await db.analyses.find_one({"id": analysis_id}, {"_id": 0})
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    if analysis["status"] not in ("pending", "running"):
+        raise HTTPException(status_code=409, detail=f"Analysis is {analysis['status']}")
+    
+    cancelled = await db.analyses.update_one(
+        {"id": analysis_id, "status": {"$in": ["pending", "running"]}},
+        {"$set": {
+            "status": "cancelled",
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    if cancelled.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Analysis finished before it could be cancelled")
+    
+    budget = active_budgets.get(analysis_id)
+    if budget:
+        await asyncio.to_thread(budget.cancel)
+    analysis_queue.cancel(analysis_id)
+    
+    return AnalysisResponse(
+        analysis_id=analysis_id,
+        status="cancelled",
+        message=f"Analysis {analysis_id} cancelled"
+    )
 
 
 @api_router.get("/report/{analysis_id}")
@@ -183,6 +435,33 @@ async def download_report(analysis_id: str):
     )
 
 
+@api_router.get("/report/{analysis_id}/components/{slug}")
+async def download_component_report(analysis_id: str, slug: str):
+    """Download the HTML report for one component of a multi-component analysis"""
+    analysis = await db.analyses.find_one({"id": analysis_id}, {"_id": 0})
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    if analysis["status"] != "completed":
+        raise HTTPException(status_code=400, detail=f"Analysis is {analysis['status']}")
+    
+    component = next((c for c in analysis.get("components") or [] if c["slug"] == slug), None)
+    if not component or not component.get("report_path"):
+        raise HTTPException(status_code=404, detail="Component report not found")
+    
+    report_path = Path(component["report_path"])
+    
+    if not report_path.exists():
+        raise HTTPException(status_code=404, detail="Report file not found")
+    
+    return FileResponse(
+        path=report_path,
+        filename=f"misra_report_{analysis_id}_{slug}.html",
+        media_type="text/html"
+    )
+
+
 @api_router.get("/analyses", response_model=List[AnalysisStatus])
 async def list_analyses():
     """List all analyses"""
@@ -193,10 +472,27 @@ async def list_analyses():
             analysis["created_at"] = datetime.fromisoformat(analysis["created_at"])
         if analysis.get("completed_at") and isinstance(analysis["completed_at"], str):
             analysis["completed_at"] = datetime.fromisoformat(analysis["completed_at"])
+        add_queue_estimate(analysis)
     
     return analyses
 
 
+@api_router.get("/projects/{project}/trend", response_model=ProjectTrend)
+async def get_project_trend(project: str, days: int = Query(90, ge=1, le=3650), rule: Optional[str] = None):
+    """Daily violation counts for a project, read from pre-aggregated rollups"""
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+    points = await db.violation_rollups.find(
+        {"project": project, "day": {"$gte": since}},
+        {"_id": 0}
+    ).sort("day", 1).to_list(days + 1)
+    
+    if rule:
+        for point in points:
+            point["rule_counts"] = [rc for rc in point.get("rule_counts", []) if rc["rule"] == rule]
+    
+    return ProjectTrend(project=project, points=points)
+
+
 app.include_router(api_router)
 
 app.add_middleware(
@@ -213,6 +509,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_db_client():
+    await db.violation_rollups.create_index([("project", 1), ("day", 1)], unique=True)
+    await train_cost_model()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
@@ -0,0 +1,299 @@
+"""Local load-testing harness for the MISRA analysis API.
+
+Starts backend/server.py under uvicorn on a local port with an in-memory
+stand-in for MongoDB and a stubbed analyzer of configurable duration, then
+drives mixed upload / status-poll / report-download traffic at one or more
+concurrency levels and prints throughput and latency percentiles per
+endpoint.
+
+    python backend_loadtest.py --concurrency 1,8,32 --duration 15 --analysis-seconds 2
+"""
+import argparse
+import asyncio
+import copy
+import io
+import logging
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "misra_loadtest")
+
+
+def _match_value(value, condition):
+    if isinstance(condition, dict) and any(k.startswith('$') for k in condition):
+        for op, operand in condition.items():
+            if op == '$ne' and value == operand:
+                return False
+            if op == '$gte' and (value is None or value < operand):
+                return False
+            if op == '$exists' and (value is not None) != operand:
+                return False
+            if op == '$in' and value not in operand:
+                return False
+        return True
+    return value == condition
+
+
+def _matches(doc, query):
+    return all(_match_value(doc.get(key), condition) for key, condition in query.items())
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if projection:
+        included = [k for k, v in projection.items() if v and k != '_id']
+        if included:
+            doc = {k: doc[k] for k in included if k in doc}
+    return doc
+
+
+class InMemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        self.docs.sort(key=lambda d: (d.get(key) is None, d.get(key)), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length] if length else self.docs
+
+
+class InMemoryCollection:
+    """The subset of the Motor collection API used by server.py"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(copy.deepcopy(doc))
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if _matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query, projection=None):
+        return InMemoryCursor([_project(d, projection) for d in self.docs if _matches(d, query)])
+
+    async def update_one(self, query, update, upsert=False):
+        target = next((d for d in self.docs if _matches(d, query)), None)
+        if target is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0, modified_count=0)
+            target = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            self.docs.append(target)
+        for key, value in update.get('$set', {}).items():
+            target[key] = copy.deepcopy(value)
+        for key, value in update.get('$inc', {}).items():
+            target[key] = target.get(key, 0) + value
+        return SimpleNamespace(matched_count=1, modified_count=1)
+
+    async def create_index(self, *args, **kwargs):
+        return None
+
+
+class InMemoryDatabase:
+    def __init__(self):
+        self.collections = defaultdict(InMemoryCollection)
+
+    def __getattr__(self, name):
+        return self.collections[name]
+
+
+def make_stub_analyzer(duration):
+    """Replacement for run_analysis that sleeps instead of running tools"""
+    def stub_run_analysis(source_dir, jobs=None, budget=None, exclude=None, profile=False):
+        time.sleep(duration)
+        return {
+            'violations': [],
+            'summary': {
+                'files_analyzed': 1,
+                'lines_analyzed': 10,
+                'total_violations': 0,
+                'severity_counts': {'mandatory': 0, 'required': 0, 'advisory': 0},
+                'rule_counts': [],
+                'file_stats': {}
+            },
+            'resource_breaches': []
+        }
+    return stub_run_analysis
+
+
+def make_test_zip():
+    """Build a small in-memory archive with one C file"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("src/main.c", "int main(void)\n{\n    return 0;\n}\n")
+    return buffer.getvalue()
+
+
+def start_server(analysis_seconds, workdir):
+    """Start server.py in a background uvicorn thread, return its base URL"""
+    import uvicorn
+    import server
+
+    # Per-request INFO logs from the server and httpx would drown the results
+    logging.getLogger().setLevel(logging.WARNING)
+    server.db = InMemoryDatabase()
+    server.run_analysis = make_stub_analyzer(analysis_seconds)
+    server.UPLOAD_DIR = Path(workdir) / "uploads"
+    server.OUTPUT_DIR = Path(workdir) / "reports"
+    server.UPLOAD_DIR.mkdir(parents=True)
+    server.OUTPUT_DIR.mkdir(parents=True)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", uvicorn_server
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadRunner:
+    def __init__(self, base_url, weights):
+        self.api_url = f"{base_url}/api"
+        self.weights = weights
+        self.zip_bytes = make_test_zip()
+        self.analysis_ids = []
+        self.completed_ids = []
+
+    async def _request(self, client, stats, name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            response = None
+        stats[name]['latencies'].append(time.perf_counter() - start)
+        if response is None or response.status_code >= 500:
+            stats[name]['errors'] += 1
+        elif response.status_code >= 400:
+            stats[name]['rejected'] += 1
+        return response
+
+    async def _upload(self, client, stats):
+        files = {'file': ('loadtest.zip', self.zip_bytes, 'application/zip')}
+        response = await self._request(client, stats, 'POST /upload', 'POST', f"{self.api_url}/upload", files=files)
+        if response is not None and response.status_code == 200:
+            self.analysis_ids.append(response.json()['analysis_id'])
+
+    async def _poll(self, client, stats):
+        if not self.analysis_ids:
+            return await self._upload(client, stats)
+        analysis_id = random.choice(self.analysis_ids[-200:])
+        response = await self._request(client, stats, 'GET /analysis/{id}', 'GET', f"{self.api_url}/analysis/{analysis_id}")
+        if response is not None and response.status_code == 200 and response.json()['status'] == 'completed':
+            self.completed_ids.append(analysis_id)
+
+    async def _download(self, client, stats):
+        if not self.completed_ids:
+            return await self._request(client, stats, 'GET /analyses', 'GET', f"{self.api_url}/analyses")
+        analysis_id = random.choice(self.completed_ids[-200:])
+        await self._request(client, stats, 'GET /report/{id}', 'GET', f"{self.api_url}/report/{analysis_id}")
+
+    async def _worker(self, client, stats, deadline):
+        operations = [self._upload, self._poll, self._download]
+        while time.perf_counter() < deadline:
+            operation = random.choices(operations, weights=self.weights)[0]
+            await operation(client, stats)
+
+    async def run_level(self, concurrency, duration):
+        import httpx
+
+        stats = defaultdict(lambda: {'latencies': [], 'errors': 0, 'rejected': 0})
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            start = time.perf_counter()
+            deadline = start + duration
+            await asyncio.gather(*(self._worker(client, stats, deadline) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+        return stats, elapsed
+
+
+def print_level(concurrency, stats, elapsed):
+    print(f"\n📊 Concurrency {concurrency} ({elapsed:.1f}s)")
+    print(f"   {'Endpoint':<22}{'Requests':>9}{'5xx/err':>8}{'4xx':>6}{'OK/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    total = total_ok = 0
+    for name in sorted(stats):
+        latencies = sorted(stats[name]['latencies'])
+        # Throughput counts only requests the server accepted
+        ok = len(latencies) - stats[name]['errors'] - stats[name]['rejected']
+        total += len(latencies)
+        total_ok += ok
+        print(
+            f"   {name:<22}{len(latencies):>9}{stats[name]['errors']:>8}{stats[name]['rejected']:>6}"
+            f"{ok / elapsed:>9.1f}"
+            f"{percentile(latencies, 50) * 1000:>9.1f}"
+            f"{percentile(latencies, 95) * 1000:>9.1f}"
+            f"{percentile(latencies, 99) * 1000:>9.1f}"
+        )
+    print(f"   {'Total':<22}{total:>9}{'':>14}{total_ok / elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the MISRA analysis API locally")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds of traffic per concurrency level (default: 10)")
+    parser.add_argument("--analysis-seconds", type=float, default=1.0,
+                        help="Duration of each stubbed analysis (default: 1)")
+    parser.add_argument("--mix", default="1,8,2",
+                        help="Relative weights of upload,poll,download requests (default: 1,8,2)")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    weights = [float(w) for w in args.mix.split(',')]
+
+    print("🚀 Starting MISRA C Analyzer API load test")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory(prefix="misra_loadtest_") as workdir:
+        base_url, uvicorn_server = start_server(args.analysis_seconds, workdir)
+        print(f"   Server: {base_url} (in-memory database, {args.analysis_seconds}s stub analysis)")
+
+        runner = LoadRunner(base_url, weights)
+        for concurrency in levels:
+            stats, elapsed = asyncio.run(runner.run_level(concurrency, args.duration))
+            print_level(concurrency, stats, elapsed)
+
+        # Jobs still queued fail when the server loop stops; that is not part of the measurement
+        logging.disable(logging.ERROR)
+        uvicorn_server.should_exit = True
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,7 @@ from datetime import datetime
 from pathlib import Path
 
 class MISRAAPITester:
-    def __init__(self, base_url="https://misra-analyzer.preview.emergentagent.com"):
+    def __init__(self, base_url=os.environ.get("BACKEND_URL", "https://misra-analyzer.preview.emergentagent.com")):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.tests_run = 0
@@ -31,9 +31,11 @@ class MISRAAPITester:
                 response = requests.get(url, headers=headers, timeout=30)
             elif method == 'POST':
                 if files:
-                    response = requests.post(url, files=files, timeout=60)
+                    response = requests.post(url, files=files, data=data, timeout=60)
                 else:
                     response = requests.post(url, json=data, headers=headers, timeout=60)
+            elif method == 'DELETE':
+                response = requests.delete(url, headers=headers, timeout=30)
 
             success = response.status_code == expected_status
             if success:
@@ -54,6 +56,22 @@ class MISRAAPITester:
             print(f"❌ Failed - Error: {str(e)}")
             return False, {}
 
+    def wait_for_analysis(self, analysis_id, max_wait=60):
+        """Poll an analysis until it leaves pending/running and return its status"""
+        import time
+        waited = 0
+        analysis = {}
+        while waited <= max_wait:
+            response = requests.get(f"{self.api_url}/analysis/{analysis_id}", timeout=30)
+            if response.status_code != 200:
+                return {}
+            analysis = response.json()
+            if analysis.get('status') not in ['pending', 'running']:
+                break
+            time.sleep(2)
+            waited += 2
+        return analysis
+
     def create_test_zip(self):
         """Create a test ZIP file with C code"""
         temp_dir = tempfile.mkdtemp()
@@ -276,6 +294,189 @@ int main() {
         
         return success
 
+    def test_project_trend(self):
+        """Test the project trend includes the completed analysis"""
+        if not self.analysis_id:
+            print("❌ No analysis ID available for trend check")
+            return False
+        
+        # Uploads default to the ZIP name without extension as project
+        success, response = self.run_test(
+            "Project Trend",
+            "GET",
+            "projects/test_code/trend?days=30",
+            200
+        )
+        
+        if success:
+            points = response.get('points', [])
+            print(f"   Found {len(points)} trend points")
+            return len(points) > 0 and 'severity_counts' in points[-1]
+        return False
+
+    def test_project_trend_invalid_days(self):
+        """Test trend rejects a non-positive window"""
+        success, response = self.run_test(
+            "Project Trend (Invalid Days)",
+            "GET",
+            "projects/test_code/trend?days=-1",
+            422
+        )
+        return success
+
+    def upload_with_project(self, name, project, expected_status):
+        """Upload the test ZIP with a project form field"""
+        zip_path = self.create_test_zip()
+        try:
+            with open(zip_path, 'rb') as f:
+                files = {'file': ('test_code.zip', f, 'application/zip')}
+                return self.run_test(name, "POST", "upload", expected_status, data={'project': project}, files=files)
+        finally:
+            try:
+                os.remove(zip_path)
+                os.rmdir(os.path.dirname(zip_path))
+            except:
+                pass
+
+    def test_blank_project_name(self):
+        """Test a blank project name falls back to the ZIP name"""
+        success, response = self.upload_with_project("Upload (Blank Project)", "   ", 200)
+        if not success or 'analysis_id' not in response:
+            return False
+        
+        status = self.wait_for_analysis(response['analysis_id'])
+        project = status.get('project') if status else None
+        print(f"   Project: {project!r}")
+        return project == "test_code"
+
+    def test_invalid_project_name(self):
+        """Test a project name with '/' is rejected"""
+        success, response = self.upload_with_project("Upload (Project With Slash)", "team/firmware", 400)
+        return success
+
+    def test_cancel_analysis(self):
+        """Test cancelling a fresh upload leaves it cancelled, or finished if it won the race"""
+        zip_path = self.create_test_zip()
+        
+        try:
+            with open(zip_path, 'rb') as f:
+                files = {'file': ('cancel_test.zip', f, 'application/zip')}
+                success, response = self.run_test("Upload For Cancel", "POST", "upload", 200, files=files)
+            if not success:
+                return False
+            analysis_id = response['analysis_id']
+            
+            print(f"\n🔍 Testing Cancel Analysis...")
+            self.tests_run += 1
+            cancel = requests.delete(f"{self.api_url}/analysis/{analysis_id}", timeout=30)
+            analysis = self.wait_for_analysis(analysis_id)
+            
+            # A 409 is only correct if the analysis really finished first
+            if cancel.status_code == 200:
+                expected = ['cancelled']
+            elif cancel.status_code == 409:
+                expected = ['completed', 'failed']
+            else:
+                expected = []
+            if analysis.get('status') in expected:
+                self.tests_passed += 1
+                print(f"✅ Passed - Cancel {cancel.status_code}, final status: {analysis.get('status')}")
+                return True
+            print(f"❌ Failed - Cancel {cancel.status_code}, final status: {analysis.get('status')}")
+            return False
+        finally:
+            try:
+                os.remove(zip_path)
+                os.rmdir(os.path.dirname(zip_path))
+            except:
+                pass
+
+    def test_cancel_finished_analysis(self):
+        """Test cancelling a finished analysis is rejected"""
+        if not self.analysis_id:
+            print("❌ No analysis ID available for cancel check")
+            return False
+        
+        success, response = self.run_test(
+            "Cancel Finished Analysis",
+            "DELETE",
+            f"analysis/{self.analysis_id}",
+            409
+        )
+        return success
+
+    def test_cancel_not_found(self):
+        """Test cancelling an unknown analysis"""
+        fake_id = "00000000-0000-0000-0000-000000000000"
+        success, response = self.run_test(
+            "Cancel Analysis (Not Found)",
+            "DELETE",
+            f"analysis/{fake_id}",
+            404
+        )
+        return success
+
+    def create_component_zip(self):
+        """Create a ZIP with two components listed in a misra-components.json manifest"""
+        temp_dir = tempfile.mkdtemp()
+        zip_path = os.path.join(temp_dir, "components.zip")
+        
+        with zipfile.ZipFile(zip_path, 'w') as zipf:
+            zipf.writestr("misra-components.json",
+                          '{"components": [{"name": "motor", "path": "motor"}, {"name": "comms", "path": "comms"}]}')
+            zipf.writestr("motor/motor.c", "int motor_speed(int x)\n{\n    int unused;\n    return x;\n}\n")
+            zipf.writestr("comms/comms.c", "int comms_send(void)\n{\n    int unused;\n    return 0;\n}\n")
+        
+        return zip_path
+
+    def test_component_reports(self):
+        """Test a manifest archive yields per-component reports linked from the index"""
+        zip_path = self.create_component_zip()
+        
+        try:
+            with open(zip_path, 'rb') as f:
+                files = {'file': ('components.zip', f, 'application/zip')}
+                success, response = self.run_test("Upload Components", "POST", "upload", 200, files=files)
+            if not success:
+                return False
+            analysis_id = response['analysis_id']
+            
+            analysis = self.wait_for_analysis(analysis_id)
+            components = analysis.get('components') or []
+            print(f"   Status: {analysis.get('status')}, components: {[c.get('slug') for c in components]}")
+            if analysis.get('status') != 'completed' or sorted(c['slug'] for c in components) != ['comms', 'motor']:
+                print("❌ Analysis did not complete with two components")
+                return False
+            
+            for component in components:
+                success, _ = self.run_test(
+                    f"Component Report ({component['slug']})",
+                    "GET",
+                    f"report/{analysis_id}/components/{component['slug']}",
+                    200
+                )
+                if not success:
+                    return False
+            
+            index = requests.get(f"{self.api_url}/report/{analysis_id}", timeout=30)
+            if f"/api/report/{analysis_id}/components/motor" not in index.text:
+                print("❌ Index report does not link to the component reports")
+                return False
+            
+            success, _ = self.run_test(
+                "Component Report (Unknown Slug)",
+                "GET",
+                f"report/{analysis_id}/components/missing",
+                404
+            )
+            return success
+        finally:
+            try:
+                os.remove(zip_path)
+                os.rmdir(os.path.dirname(zip_path))
+            except:
+                pass
+
 def main():
     """Run all API tests"""
     print("🚀 Starting MISRA C Analyzer API Tests")
@@ -292,6 +493,14 @@ def main():
         ("Analysis Status Not Found", tester.test_analysis_status_not_found),
         ("Report Download", tester.test_report_download),
         ("List Analyses", tester.test_list_analyses),
+        ("Project Trend", tester.test_project_trend),
+        ("Project Trend Invalid Days", tester.test_project_trend_invalid_days),
+        ("Blank Project Name", tester.test_blank_project_name),
+        ("Invalid Project Name", tester.test_invalid_project_name),
+        ("Cancel Analysis", tester.test_cancel_analysis),
+        ("Cancel Finished Analysis", tester.test_cancel_finished_analysis),
+        ("Cancel Not Found", tester.test_cancel_not_found),
+        ("Component Reports", tester.test_component_reports),
     ]
     
     for test_name, test_func in tests:
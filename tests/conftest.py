@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The analysis and report packages are imported from backend/, as server.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
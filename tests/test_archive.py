@@ -0,0 +1,155 @@
+import struct
+import zipfile
+
+import pytest
+
+from analysis import archive
+from analysis.archive import ArchiveRejected, check_archive, extract_sources, inspect_archive
+from analysis.limits import AnalysisCancelled
+
+
+def make_zip(path, members, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(path, "w", compression) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return str(path)
+
+
+def understate_size(zip_path, declared):
+    """Rewrite the uncompressed size of the only member in both of its headers"""
+    with open(zip_path, "rb") as f:
+        data = bytearray(f.read())
+    struct.pack_into("<I", data, data.find(b"PK\x03\x04") + 22, declared)
+    struct.pack_into("<I", data, data.find(b"PK\x01\x02") + 24, declared)
+    with open(zip_path, "wb") as f:
+        f.write(data)
+
+
+def inventory(source_files=1, source_bytes=1000, source_compressed_bytes=500, members=1):
+    return {
+        "members": members,
+        "source_files": source_files,
+        "source_bytes": source_bytes,
+        "source_compressed_bytes": source_compressed_bytes,
+        "relevant_members": ["main.c"] * source_files,
+    }
+
+
+def test_inspect_archive_counts_relevant_members(tmp_path):
+    zip_path = make_zip(tmp_path / "project.zip", {
+        "proj/src/main.c": "int main(void) { return 0; }\n",
+        "proj/include/main.h": "int f(void);\n",
+        "proj/include/table.inc": "1, 2, 3\n",
+        "proj/.misraignore": "build/\n",
+        "proj/misra-components.json": "{}",
+        "proj/docs/manual.pdf": "x" * 100,
+        "proj/empty/": "",
+    })
+
+    result = inspect_archive(zip_path)
+
+    assert result["members"] == 7
+    assert result["source_files"] == 2
+    assert result["header_files"] == 1
+    assert sorted(result["relevant_members"]) == [
+        "proj/.misraignore", "proj/include/main.h", "proj/include/table.inc",
+        "proj/misra-components.json", "proj/src/main.c",
+    ]
+    assert result["total_bytes"] > result["source_bytes"]
+
+
+@pytest.mark.parametrize("name", ["../evil.c", "src/../../evil.h", "/etc/evil.c", "src\\..\\..\\evil.c"])
+def test_inspect_archive_rejects_unsafe_paths(tmp_path, name):
+    zip_path = make_zip(tmp_path / "evil.zip", {"main.c": "int x;\n", name: "int y;\n"})
+    with pytest.raises(ArchiveRejected, match="Unsafe path"):
+        inspect_archive(zip_path)
+
+
+def test_inspect_archive_ignores_unsafe_paths_it_never_extracts(tmp_path):
+    zip_path = make_zip(tmp_path / "docs.zip", {"main.c": "int x;\n", "../README": "text"})
+    assert inspect_archive(zip_path)["relevant_members"] == ["main.c"]
+
+
+def test_inspect_archive_rejects_invalid_zip(tmp_path):
+    not_zip = tmp_path / "project.zip"
+    not_zip.write_bytes(b"not a zip file")
+    with pytest.raises(ArchiveRejected, match="Invalid ZIP"):
+        inspect_archive(str(not_zip))
+
+
+def test_check_archive_accepts_normal_archive():
+    assert check_archive(inventory()) == []
+
+
+def test_check_archive_rejects_archive_without_sources():
+    with pytest.raises(ArchiveRejected, match="No C/C"):
+        check_archive(inventory(source_files=0))
+
+
+def test_check_archive_rejects_oversized_sources(monkeypatch):
+    monkeypatch.setattr(archive, "MAX_UNCOMPRESSED_BYTES", 1000)
+    with pytest.raises(ArchiveRejected, match="limit is 1000"):
+        check_archive(inventory(source_bytes=1001, source_compressed_bytes=1000))
+
+
+def test_check_archive_rejects_high_compression_ratio(monkeypatch):
+    monkeypatch.setattr(archive, "MAX_COMPRESSION_RATIO", 100)
+    check_archive(inventory(source_bytes=100 * 50, source_compressed_bytes=50))
+    with pytest.raises(ArchiveRejected, match="Compression ratio"):
+        check_archive(inventory(source_bytes=101 * 50, source_compressed_bytes=50))
+
+
+def test_check_archive_ratio_of_real_zip_bomb(tmp_path):
+    zip_path = make_zip(tmp_path / "bomb.zip", {"main.c": "\0" * (4 * 1024 * 1024)})
+    with pytest.raises(ArchiveRejected, match="Compression ratio"):
+        check_archive(inspect_archive(zip_path))
+
+
+def test_check_archive_file_count_limit_and_warning(monkeypatch):
+    monkeypatch.setattr(archive, "MAX_SOURCE_FILES", 10)
+    monkeypatch.setattr(archive, "WARN_SOURCE_FILES", 5)
+    assert check_archive(inventory(source_files=5, members=5)) == []
+    assert check_archive(inventory(source_files=6, members=6)) == [
+        "Large archive: 6 source files, analysis may take a while"
+    ]
+    with pytest.raises(ArchiveRejected, match="11 source files, limit is 10"):
+        check_archive(inventory(source_files=11, members=11))
+
+
+def test_extract_sources_writes_only_relevant_members(tmp_path):
+    zip_path = make_zip(tmp_path / "project.zip", {
+        "proj/src/main.c": "int main(void) { return 0; }\n",
+        "proj/include/main.h": "int f(void);\n",
+        "proj/.misraignore": "build/\n",
+        "proj/build/main.o": "\x7fELF",
+        "proj/README.md": "readme",
+    })
+    dest = tmp_path / "out"
+
+    written = extract_sources(zip_path, str(dest), inspect_archive(zip_path))
+
+    extracted = sorted(p.relative_to(dest).as_posix() for p in dest.rglob("*") if p.is_file())
+    assert extracted == ["proj/.misraignore", "proj/include/main.h", "proj/src/main.c"]
+    assert (dest / "proj/src/main.c").read_text() == "int main(void) { return 0; }\n"
+    assert written == sum((dest / name).stat().st_size for name in extracted)
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_extract_sources_rejects_member_larger_than_declared(tmp_path, compression):
+    zip_path = make_zip(tmp_path / "lying.zip", {"main.c": "A" * 5000}, compression)
+    understate_size(zip_path, 100)
+    result = inspect_archive(zip_path)
+    assert result["source_bytes"] == 100
+    dest = tmp_path / "out"
+
+    with pytest.raises(ArchiveRejected, match="larger than declared"):
+        extract_sources(zip_path, str(dest), result)
+    assert (dest / "main.c").stat().st_size <= 100
+
+
+def test_extract_sources_stops_when_cancelled(tmp_path):
+    zip_path = make_zip(tmp_path / "project.zip", {"a.c": "int a;\n", "b.c": "int b;\n"})
+    dest = tmp_path / "out"
+    with pytest.raises(AnalysisCancelled):
+        extract_sources(zip_path, str(dest), inspect_archive(zip_path), should_stop=lambda: True)
+    assert not dest.exists()
@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from analysis import cli
+from analysis.analyzer import MISRAAnalyzer
+
+
+def summary(total=0, mandatory=0, required=0, advisory=0):
+    return {
+        "files_analyzed": 1,
+        "total_violations": total,
+        "severity_counts": {"mandatory": mandatory, "required": required, "advisory": advisory},
+    }
+
+
+def limits(**overrides):
+    values = {"max_violations": None, "max_mandatory": None, "max_required": None, "max_advisory": None}
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_check_thresholds_without_limits_passes():
+    assert cli.check_thresholds(summary(total=99, mandatory=9), limits()) == []
+
+
+def test_check_thresholds_reports_every_exceeded_limit():
+    breaches = cli.check_thresholds(
+        summary(total=5, mandatory=1, required=3, advisory=1),
+        limits(max_violations=4, max_mandatory=0, max_required=3, max_advisory=0),
+    )
+    assert breaches == [
+        "total violations 5 exceed limit 4",
+        "mandatory violations 1 exceed limit 0",
+        "advisory violations 1 exceed limit 0",
+    ]
+
+
+def test_check_thresholds_limit_is_inclusive():
+    assert cli.check_thresholds(summary(total=3), limits(max_violations=3)) == []
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.c").write_text("int main(void) { return 0; }\n")
+    return tmp_path
+
+
+def run_cli(monkeypatch, source_tree, results, *args):
+    monkeypatch.setattr(cli, "detect_components", lambda *a, **k: [])
+    monkeypatch.setattr(cli, "run_analysis", lambda *a, **k: results)
+    output_dir = source_tree / "out"
+    code = cli.main([str(source_tree / "src"), "-o", str(output_dir), "-f", "json", "-q", *args])
+    return code, output_dir
+
+
+def analysis_results(mandatory=0, tool_errors=()):
+    return {
+        "violations": [],
+        "summary": summary(total=mandatory, mandatory=mandatory),
+        "resource_breaches": [],
+        "tool_errors": list(tool_errors),
+    }
+
+
+def test_exit_ok_when_within_thresholds(monkeypatch, source_tree):
+    code, output_dir = run_cli(monkeypatch, source_tree, analysis_results(), "--max-mandatory", "0")
+    assert code == cli.EXIT_OK
+    assert json.loads((output_dir / "misra_results.json").read_text())["violations"] == []
+
+
+def test_exit_threshold_when_limit_exceeded(monkeypatch, source_tree):
+    code, _ = run_cli(monkeypatch, source_tree, analysis_results(mandatory=2), "--max-mandatory", "1")
+    assert code == cli.EXIT_THRESHOLD
+
+
+def test_exit_error_on_tool_errors_even_within_thresholds(monkeypatch, source_tree):
+    results = analysis_results(tool_errors=[{"tool": "cppcheck", "detail": "timed out"}])
+    code, _ = run_cli(monkeypatch, source_tree, results, "--max-mandatory", "0")
+    assert code == cli.EXIT_ERROR
+
+
+def test_exit_error_when_analysis_raises(monkeypatch, source_tree):
+    def fail(*args, **kwargs):
+        raise Exception("No C/C++ source files found in the uploaded archive")
+
+    monkeypatch.setattr(cli, "detect_components", lambda *a, **k: [])
+    monkeypatch.setattr(cli, "run_analysis", fail)
+    assert cli.main([str(source_tree / "src"), "-o", str(source_tree / "out"), "-q"]) == cli.EXIT_ERROR
+
+
+def test_exit_error_when_results_cannot_be_written(monkeypatch, source_tree):
+    def fail(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(cli, "write_results", fail)
+    code, _ = run_cli(monkeypatch, source_tree, analysis_results(mandatory=2), "--max-mandatory", "1")
+    assert code == cli.EXIT_ERROR
+
+
+def test_exit_error_for_missing_source_dir(tmp_path):
+    assert cli.main([str(tmp_path / "missing"), "-q"]) == cli.EXIT_ERROR
+
+
+class RecordingBudget:
+    cancelled = False
+    breaches = []
+
+    def __init__(self):
+        self.commands = []
+
+    def run(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        build_dirs = [a.split("=", 1)[1] for a in cmd if a.startswith("--cppcheck-build-dir=")]
+        assert all(Path(d).is_dir() for d in build_dirs)
+        return SimpleNamespace(returncode=0)
+
+
+@pytest.mark.parametrize("jobs, parallel", [(None, False), (1, False), (4, True)])
+def test_parallel_cppcheck_uses_build_dir(source_tree, jobs, parallel):
+    budget = RecordingBudget()
+    analyzer = MISRAAnalyzer(str(source_tree / "src"), jobs=jobs, budget=budget)
+    analyzer.find_source_files()
+    list(analyzer.iter_cppcheck())
+
+    cmd = budget.commands[0]
+    assert ("-j4" in cmd) == parallel
+    assert any(a.startswith("--cppcheck-build-dir=") for a in cmd) == parallel
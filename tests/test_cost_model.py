@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from analysis.cost_model import (
+    DEFAULT_COEFFICIENTS, FEATURES, MIN_SAMPLES, STAGES, CostModel, _nnls, features_from_inventory
+)
+
+BIG_JOB = {"source_files": 4000.0, "header_files": 1000.0, "source_kb": 2000.0}
+
+
+def sample(source_files, header_files, source_kb, analysis, extract=0.01, report=0.05):
+    return {
+        "features": {"source_files": source_files, "header_files": header_files, "source_kb": source_kb},
+        "timings": {"extract": extract, "analysis": analysis, "report": report},
+    }
+
+
+def small_jobs(count):
+    """Small, nearly collinear jobs whose timings are dominated by noise"""
+    rng = np.random.default_rng(7)
+    jobs = []
+    for _ in range(count):
+        files = float(rng.integers(2, 9))
+        jobs.append(sample(
+            files, float(rng.integers(1, 4)), files * 1.5 + rng.random(),
+            analysis=1.0 + 0.3 * files + rng.normal(0, 0.6),
+            extract=0.01 + rng.random() * 0.01, report=0.05 + rng.random() * 0.02,
+        ))
+    return jobs
+
+
+def test_min_samples_exceeds_coefficient_count():
+    assert MIN_SAMPLES > len(FEATURES) + 1
+
+
+def test_keeps_defaults_until_enough_samples():
+    model = CostModel()
+    assert model.fit(small_jobs(MIN_SAMPLES - 1)) == MIN_SAMPLES - 1
+    assert model.samples == 0
+    assert model.coefficients == DEFAULT_COEFFICIENTS
+
+
+def test_samples_without_timings_are_ignored():
+    model = CostModel()
+    samples = small_jobs(MIN_SAMPLES - 1) + [{"features": {"source_files": 1.0}, "timings": None}]
+    assert model.fit(samples) == MIN_SAMPLES - 1
+    assert model.coefficients == DEFAULT_COEFFICIENTS
+
+
+@pytest.mark.parametrize("count", [MIN_SAMPLES, 3 * MIN_SAMPLES])
+def test_fit_on_small_jobs_never_predicts_big_job_as_fastest(count):
+    model = CostModel()
+    jobs = small_jobs(count)
+    assert model.fit(jobs) == count
+
+    for stage in STAGES:
+        assert all(c >= 0 for c in model.coefficients[stage]), stage
+    largest_seen = max(model.predict(job["features"]) for job in jobs)
+    assert model.predict(BIG_JOB) > largest_seen
+
+
+def test_recovers_linear_costs():
+    rng = np.random.default_rng(3)
+    jobs = []
+    for _ in range(60):
+        files, headers, kb = rng.integers(1, 500), rng.integers(0, 200), rng.uniform(1, 5000)
+        jobs.append(sample(float(files), float(headers), float(kb), analysis=2.0 + 0.5 * files + 0.1 * headers + 0.01 * kb))
+
+    model = CostModel()
+    model.fit(jobs)
+
+    intercept, *slopes = model.coefficients["analysis"]
+    assert slopes == pytest.approx([0.5, 0.1, 0.01], rel=0.02)
+    assert intercept == pytest.approx(2.0, abs=1.5)
+    assert model.predict_stages({"source_files": 100.0, "header_files": 20.0, "source_kb": 400.0})["analysis"] \
+        == pytest.approx(58.0, rel=0.02)
+
+
+def test_nnls_satisfies_optimality_conditions():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        a = rng.normal(size=(12, 4))
+        b = rng.normal(size=12)
+        x = _nnls(a, b)
+        gradient = a.T @ (b - a @ x)
+        assert (x >= 0).all()
+        assert (gradient <= 1e-8).all()
+        assert np.allclose(gradient[x > 0], 0.0, atol=1e-8)
+
+
+def test_features_from_inventory():
+    assert features_from_inventory({"source_files": 3, "header_files": 2, "source_bytes": 2048}) == {
+        "source_files": 3.0, "header_files": 2.0, "source_kb": 2.0
+    }
+    assert features_from_inventory({}) == {"source_files": 0.0, "header_files": 0.0, "source_kb": 0.0}
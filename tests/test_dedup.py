@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from analysis.dedup import DuplicateIndex
+
+
+def write(root: Path, relative: str, text: str) -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def build_index(root: Path) -> DuplicateIndex:
+    files = sorted(p for p in root.rglob("*") if p.suffix in (".c", ".h"))
+    units = [p for p in files if p.suffix == ".c"]
+    return DuplicateIndex(root, files, units)
+
+
+def finding(file_name, line=1):
+    return {"file": file_name, "line": line, "rule": "R", "message": "m"}
+
+
+def test_identical_copies_are_analyzed_once_and_findings_fanned_out(tmp_path):
+    for copy in ("a", "b"):
+        write(tmp_path, f"{copy}/lib.c", '#include "lib.h"\nint f(void) { return LIB; }\n')
+        write(tmp_path, f"{copy}/lib.h", "#define LIB 1\n")
+
+    index = build_index(tmp_path)
+    units = sorted(tmp_path.rglob("*.c"))
+    assert index.representatives(units) == [tmp_path / "a/lib.c"]
+    assert index.stats()["files_skipped"] == 1
+
+    fanned = list(index.fan_out([finding("a/lib.c", 2), finding("a/lib.h", 1)]))
+    assert sorted((v["file"], v["line"]) for v in fanned) == [
+        ("a/lib.c", 2), ("a/lib.h", 1), ("b/lib.c", 2), ("b/lib.h", 1)
+    ]
+
+
+def test_copies_with_different_includes_are_both_analyzed(tmp_path):
+    for copy, value in (("a", "1"), ("b", "2")):
+        write(tmp_path, f"{copy}/lib.c", '#include "lib.h"\nint f(void) { return LIB; }\n')
+        write(tmp_path, f"{copy}/lib.h", f"#define LIB {value}\n")
+
+    index = build_index(tmp_path)
+    units = sorted(tmp_path.rglob("*.c"))
+    assert index.representatives(units) == units
+    assert list(index.fan_out([finding("a/lib.c")])) == [finding("a/lib.c")]
+
+
+def test_identical_headers_alone_are_not_grouped(tmp_path):
+    write(tmp_path, "a/types.h", "typedef int s32;\n")
+    write(tmp_path, "b/types.h", "typedef int s32;\n")
+    write(tmp_path, "main.c", "int main(void) { return 0; }\n")
+
+    index = build_index(tmp_path)
+    assert index.stats() == {"groups": 0, "files_skipped": 0, "bytes_skipped": 0}
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+from analysis.exclusions import PathFilter, split_patterns
+
+BASE = Path("/src")
+
+
+def excluded(patterns, path, is_dir=False):
+    return PathFilter(patterns, BASE).is_excluded(BASE / path, is_dir)
+
+
+def test_unanchored_pattern_matches_at_any_depth():
+    assert excluded(["*_regs.h"], "board_regs.h")
+    assert excluded(["*_regs.h"], "hw/gen/board_regs.h")
+    assert not excluded(["*_regs.h"], "hw/regs.c")
+
+
+def test_anchored_pattern_matches_only_from_base():
+    assert excluded(["/build"], "build", is_dir=True)
+    assert not excluded(["/build"], "lib/build", is_dir=True)
+    assert excluded(["lib/build"], "lib/build", is_dir=True)
+
+
+def test_directory_only_pattern_skips_files():
+    assert excluded(["third_party/"], "third_party", is_dir=True)
+    assert not excluded(["third_party/"], "third_party", is_dir=False)
+
+
+def test_double_star_spans_directories():
+    assert excluded(["**/generated/*.h"], "generated/a.h")
+    assert excluded(["**/generated/*.h"], "x/y/generated/a.h")
+    assert excluded(["docs/**"], "docs/a/b.c")
+
+
+def test_last_matching_rule_wins():
+    patterns = ["*.h", "!keep.h"]
+    assert excluded(patterns, "drop.h")
+    assert not excluded(patterns, "keep.h")
+    assert excluded(patterns + ["keep.h"], "keep.h")
+
+
+def test_comments_blank_lines_and_character_classes():
+    patterns = ["# comment", "", "   ", "test_[0-9].c", "gen_[!a].c"]
+    assert len(PathFilter(patterns, BASE)) == 2
+    assert excluded(patterns, "test_1.c")
+    assert not excluded(patterns, "test_x.c")
+    assert excluded(patterns, "gen_b.c")
+    assert not excluded(patterns, "gen_a.c")
+
+
+def test_paths_outside_base_are_not_excluded():
+    assert not PathFilter(["*.c"], BASE / "lib").is_excluded(BASE / "main.c", False)
+
+
+def test_from_file_is_relative_to_its_directory(tmp_path):
+    (tmp_path / "vendor").mkdir()
+    ignore = tmp_path / "vendor" / ".misraignore"
+    ignore.write_text("/gen/\n")
+    path_filter = PathFilter.from_file(ignore)
+    assert path_filter.is_excluded(tmp_path / "vendor" / "gen", True)
+    assert not path_filter.is_excluded(tmp_path / "gen", True)
+
+
+def test_split_patterns():
+    assert split_patterns(None) == []
+    assert split_patterns("build/, *.gen.c\n third_party/ \n") == ["build/", "*.gen.c", "third_party/"]
+
+
+def test_analyzer_prunes_excluded_paths_and_drops_their_findings(tmp_path):
+    from analysis.analyzer import MISRAAnalyzer
+
+    (tmp_path / "third_party").mkdir()
+    (tmp_path / "third_party" / "lib.h").write_text("int lib;\n")
+    (tmp_path / "main.c").write_text("int main(void) { return 0; }\n")
+    (tmp_path / ".misraignore").write_text("third_party/\n")
+
+    analyzer = MISRAAnalyzer(str(tmp_path))
+
+    def fake_cppcheck():
+        for file_name in ("main.c", "third_party/lib.h"):
+            yield {"file": file_name, "line": 1, "rule": "MISRA C:2012 Rule 2.7",
+                   "severity": "Advisory", "type": "style", "message": "m"}
+
+    analyzer.iter_cppcheck = fake_cppcheck
+    results = analyzer.analyze()
+
+    assert [v["file"] for v in results["violations"]] == ["main.c"]
+    assert results["summary"]["excluded_paths"] == ["third_party/"]
+    assert results["summary"]["files_analyzed"] == 1
+
+
+def test_analyzer_walk_from_relative_source_dir_terminates(tmp_path, monkeypatch):
+    from analysis.analyzer import MISRAAnalyzer
+
+    (tmp_path / "main.c").write_text("int main(void) { return 0; }\n")
+    monkeypatch.chdir(tmp_path)
+
+    for source_dir in (".", ""):
+        assert [p.name for p in MISRAAnalyzer(source_dir).find_source_files()] == ["main.c"]
+
+
+def test_root_ignore_file_applies_through_symlinked_root(tmp_path):
+    from analysis.analyzer import MISRAAnalyzer
+
+    real = tmp_path / "real"
+    (real / "app" / "gen").mkdir(parents=True)
+    (real / "app" / "main.c").write_text("int main(void) { return 0; }\n")
+    (real / "app" / "gen" / "table.c").write_text("int table;\n")
+    (real / ".misraignore").write_text("gen/\n")
+    link = tmp_path / "link"
+    link.symlink_to(real)
+
+    # Component paths are resolved by the manifest reader, the root is not
+    analyzer = MISRAAnalyzer(str((link / "app").resolve()), exclude=["*.h"], root_dir=str(link))
+    assert [p.name for p in analyzer.find_source_files()] == ["main.c"]
+    assert analyzer.excluded_paths == ["gen/"]
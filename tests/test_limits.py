@@ -0,0 +1,142 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from analysis import limits
+from analysis.limits import AnalysisCancelled, ResourceBudget
+
+posix_only = pytest.mark.skipif(os.name != "posix" or limits.resource is None, reason="rlimits need posix")
+
+ALLOCATE_256MB = "x = bytearray(256 * 1024 * 1024)"
+BUSY_LOOP = "while True: pass"
+
+
+@pytest.fixture(params=["prlimit", "launcher"])
+def limit_wrapper(request, monkeypatch):
+    """Run each limit test through prlimit and through the Python fallback launcher"""
+    if request.param == "prlimit":
+        if limits.PRLIMIT is None:
+            pytest.skip("prlimit is not installed")
+    else:
+        monkeypatch.setattr(limits, "PRLIMIT", None)
+    return request.param
+
+
+def run_python(budget, code, timeout=30, **kwargs):
+    return budget.run([sys.executable, "-c", code], tool="python", target="test", timeout=timeout, **kwargs)
+
+
+def completed(returncode, stderr=""):
+    return subprocess.CompletedProcess(["tool"], returncode, "", stderr)
+
+
+def test_classify_cpu_only_on_sigxcpu():
+    budget = ResourceBudget(max_cpu_seconds=10)
+    assert budget._classify(completed(-signal.SIGXCPU)) == ("cpu", "CPU time limit of 10s reached")
+    assert budget._classify(completed(-signal.SIGKILL)) == ("crashed", "killed by SIGKILL")
+
+
+def test_classify_memory_needs_marker_and_limit():
+    budget = ResourceBudget(max_memory_mb=64)
+    assert budget._classify(completed(1, "std::bad_alloc")) == ("memory", "address space limit of 64 MB reached")
+    assert budget._classify(completed(1, "syntax error")) is None
+    assert ResourceBudget()._classify(completed(1, "MemoryError")) is None
+    assert budget._classify(completed(0, "MemoryError")) is None
+
+
+def test_classify_other_signals_as_crashes():
+    budget = ResourceBudget(max_memory_mb=64, max_cpu_seconds=10)
+    assert budget._classify(completed(-signal.SIGSEGV)) == ("crashed", "killed by SIGSEGV")
+    assert budget._classify(completed(-200)) == ("crashed", "killed by signal 200")
+    assert budget._classify(completed(0)) is None
+
+
+@posix_only
+def test_limit_prefix(monkeypatch):
+    monkeypatch.setattr(limits, "PRLIMIT", "/usr/bin/prlimit")
+    prefix = ResourceBudget(max_memory_mb=64, max_cpu_seconds=10, nice=5)._limit_prefix()
+    assert prefix == ["/usr/bin/prlimit", f"--as={64 * 1024 * 1024}", "--cpu=10:15", "--", "nice", "-n", "5"]
+    assert ResourceBudget()._limit_prefix() == []
+
+    monkeypatch.setattr(limits, "PRLIMIT", None)
+    prefix = ResourceBudget(max_cpu_seconds=10)._limit_prefix()
+    assert prefix == [sys.executable, "-c", limits.RLIMIT_LAUNCHER, "0", "10", "--"]
+
+
+@posix_only
+def test_memory_limit_is_reported(limit_wrapper):
+    budget = ResourceBudget(max_memory_mb=64)
+    result = run_python(budget, ALLOCATE_256MB)
+
+    assert result.returncode != 0
+    assert [b["limit"] for b in budget.breaches] == ["memory"]
+
+
+@posix_only
+def test_cpu_limit_is_reported(limit_wrapper):
+    budget = ResourceBudget(max_cpu_seconds=1)
+    result = run_python(budget, BUSY_LOOP)
+
+    assert result.returncode == -signal.SIGXCPU
+    assert budget.breaches == [
+        {"tool": "python", "target": "test", "limit": "cpu", "detail": "CPU time limit of 1s reached"}
+    ]
+
+
+@posix_only
+def test_nice_is_applied():
+    result = run_python(ResourceBudget(nice=5), "import os; print(os.nice(0))")
+    assert int(result.stdout) == os.nice(0) + 5
+
+
+@posix_only
+def test_crash_is_reported():
+    budget = ResourceBudget()
+    run_python(budget, "import os, signal; os.kill(os.getpid(), signal.SIGSEGV)")
+    assert [(b["limit"], b["detail"]) for b in budget.breaches] == [("crashed", "killed by SIGSEGV")]
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_timeout_returns_none_and_records_breach(streamed):
+    budget = ResourceBudget()
+    started = time.monotonic()
+    result = run_python(budget, "import time; time.sleep(30)", timeout=1,
+                        line_callback=(lambda line: None) if streamed else None)
+
+    assert result is None
+    assert time.monotonic() - started < 10
+    assert budget.breaches == [
+        {"tool": "python", "target": "test", "limit": "time", "detail": "wall-clock timeout of 1s reached"}
+    ]
+
+
+def test_cancel_kills_streamed_process():
+    budget = ResourceBudget()
+    lines = []
+    code = "import time\nprint('started', flush=True)\ntime.sleep(30)"
+    threading.Timer(0.5, budget.cancel).start()
+    started = time.monotonic()
+
+    with pytest.raises(AnalysisCancelled):
+        run_python(budget, code, line_callback=lines.append)
+
+    assert time.monotonic() - started < 5
+    assert lines == ["started\n"]
+    assert budget.breaches == []
+
+
+def test_cancelled_budget_launches_nothing():
+    budget = ResourceBudget()
+    budget.cancel()
+    with pytest.raises(AnalysisCancelled):
+        run_python(budget, "print('never')")
+
+
+def test_missing_tool_raises():
+    with pytest.raises(FileNotFoundError, match="not found on PATH"):
+        ResourceBudget().run(["no-such-misra-tool"], tool="missing", target="test", timeout=5)
@@ -0,0 +1,116 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from analysis.profiling import CHECKER_RE, CHECKING_RE, CHECK_TIME_RE, CppcheckProfiler
+
+SOURCE_DIR = Path("/src/proj")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the profiler's clock; lines are fed at the times set in clock[0]"""
+    now = [100.0]
+    monkeypatch.setattr("analysis.profiling.time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def feed(profiler, clock, timed_lines):
+    for at, line in timed_lines:
+        clock[0] = at
+        profiler.feed(line + "\n")
+
+
+@pytest.mark.parametrize("line, file_name", [
+    ("Checking /src/proj/main.c ...", "/src/proj/main.c"),
+    ("Checking /src/proj/main.c: DEBUG=1...", "/src/proj/main.c"),
+    ("Checking /src/proj/main.c: DEBUG=1;UNIX=1...", "/src/proj/main.c"),
+    ("Checking /src/proj/my file.c ...", "/src/proj/my file.c"),
+])
+def test_checking_re_matches_progress_lines(line, file_name):
+    assert CHECKING_RE.match(line).group("file") == file_name
+
+
+@pytest.mark.parametrize("line", [
+    "1/3 files checked 33% done",
+    "Checking /src/proj/main.c",
+    "Check time: /src/proj/main.c: 0.53s",
+])
+def test_checking_re_ignores_other_lines(line):
+    assert CHECKING_RE.match(line) is None
+
+
+def test_checker_and_check_time_patterns():
+    match = CHECKER_RE.match("CheckOther::checkRedundantAssignment: 0.012s (avg. 0.0004s - 30 result(s))")
+    assert match.group("name", "total", "calls") == ("CheckOther::checkRedundantAssignment", "0.012", "30")
+    match = CHECK_TIME_RE.match("Check time: /src/proj/a: b.c: 1.25s")
+    assert match.group("file", "seconds") == ("/src/proj/a: b.c", "1.25")
+    assert CHECKER_RE.match("Checking /src/proj/main.c ...") is None
+
+
+def test_summary_mode_times_files_from_progress_lines(clock):
+    profiler = CppcheckProfiler(SOURCE_DIR, mode="summary")
+    feed(profiler, clock, [
+        (100.0, "Checking /src/proj/main.c ..."),
+        (101.0, "Checking /src/proj/lib/util.c ..."),
+        (101.5, "1/2 files checked 50% done"),
+        (101.5, "Checking /src/proj/main.c: DEBUG=1..."),
+        (102.25, "Tokenizer::simplifyTokens1: 0.12s (avg. 0.0012s - 100 result(s))"),
+        (102.25, "CheckOther::checkRedundantAssignment: 0.012s (avg. 0.0004s - 30 result(s))"),
+        (102.25, "CheckBufferOverrun::checkRuleOverrun: 0.5s (avg. 0.05s - 10 result(s))"),
+    ])
+    clock[0] = 103.0
+    profile = profiler.profile()
+
+    assert profile["showtime"] == "summary"
+    assert profile["file_timing_source"] == "progress"
+    assert profile["wall_seconds"] == 3.0
+    # Both configurations of main.c are attributed to it
+    assert profile["top_files"] == [
+        {"file": "main.c", "seconds": 1.75},
+        {"file": "lib/util.c", "seconds": 0.5},
+    ]
+    assert [c["name"] for c in profile["top_checkers"]] == [
+        "CheckBufferOverrun::checkRuleOverrun",
+        "Tokenizer::simplifyTokens1",
+        "CheckOther::checkRedundantAssignment",
+    ]
+    assert profile["top_checkers"][0] == {"name": "CheckBufferOverrun::checkRuleOverrun", "seconds": 0.5, "calls": 10}
+    assert profile["checkers_profiled"] == 3
+    assert profile["files_profiled"] == 2
+
+
+def test_file_total_mode_prefers_reported_check_times(clock):
+    profiler = CppcheckProfiler(SOURCE_DIR, mode="file-total")
+    feed(profiler, clock, [
+        (100.0, "Checking /src/proj/main.c ..."),
+        (100.1, "Check time: /src/proj/main.c: 0.53s"),
+        (100.1, "Checking /src/proj/drivers/uart.c ..."),
+        (100.2, "Check time: /src/proj/drivers/uart.c: 1.75s"),
+        (100.2, "Checking /other/generated.c ..."),
+        (100.3, "Check time: /other/generated.c: 0.05s"),
+    ])
+    profile = profiler.profile()
+
+    assert profile["file_timing_source"] == "cppcheck"
+    assert profile["top_files"] == [
+        {"file": "drivers/uart.c", "seconds": 1.75},
+        {"file": "main.c", "seconds": 0.53},
+        {"file": "/other/generated.c", "seconds": 0.05},
+    ]
+    assert profile["top_checkers"] == []
+
+
+def test_checker_lines_accumulate_and_top_n_limits(clock):
+    profiler = CppcheckProfiler(SOURCE_DIR)
+    feed(profiler, clock, [
+        (100.0, "CheckOther::checkA: 0.1s (avg. 0.1s - 1 result(s))"),
+        (100.0, "CheckOther::checkA: 0.2s (avg. 0.1s - 2 result(s))"),
+        (100.0, "CheckOther::checkB: 0.25s (avg. 0.25s - 1 result(s))"),
+    ])
+    profile = profiler.profile(top_n=1)
+
+    assert profile["top_checkers"] == [{"name": "CheckOther::checkA", "seconds": 0.3, "calls": 3}]
+    assert profile["checkers_profiled"] == 2
+    assert profile["files_profiled"] == 0
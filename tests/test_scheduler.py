@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from analysis.scheduler import AnalysisQueue
+
+
+def freeze_clock(monkeypatch, start):
+    """Control the scheduler's clock without touching the event loop's"""
+    clock = [start]
+    monkeypatch.setattr("analysis.scheduler.time", SimpleNamespace(monotonic=lambda: clock[0]))
+    return clock
+
+
+def run_jobs(queue, jobs, cancel=()):
+    """Submit (job_id, estimate) pairs behind a blocker job and return the start order"""
+    started = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+
+        def factory(job_id):
+            async def job():
+                started.append(job_id)
+            return job
+
+        queue.submit("blocker", 0.0, blocker)
+        for job_id, estimate in jobs:
+            queue.submit(job_id, estimate, factory(job_id))
+        for job_id in cancel:
+            queue.cancel(job_id)
+        release.set()
+        while queue.pending or queue.running:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    return started
+
+
+def test_fifo_runs_in_submission_order():
+    queue = AnalysisQueue(max_concurrent=1, policy="fifo")
+    assert run_jobs(queue, [("long", 100.0), ("short", 1.0), ("mid", 10.0)]) == ["long", "short", "mid"]
+
+
+def test_sjf_runs_shortest_estimate_first():
+    queue = AnalysisQueue(max_concurrent=1, policy="sjf", aging=0.0)
+    assert run_jobs(queue, [("long", 100.0), ("short", 1.0), ("mid", 10.0)]) == ["short", "mid", "long"]
+
+
+def test_sjf_aging_lets_waiting_jobs_overtake(monkeypatch):
+    clock = freeze_clock(monkeypatch, 1000.0)
+    queue = AnalysisQueue(max_concurrent=1, policy="sjf", aging=1.0)
+    queue.running["blocker"] = None
+    queue.submit("long", 50.0, None)
+    clock[0] += 60.0
+    queue.submit("short", 5.0, None)
+    # long: 50 - 60 waited = -10, short: 5 - 0 = 5
+    assert [job.job_id for job in queue._ordered_pending(clock[0])] == ["long", "short"]
+
+
+def test_cancelled_pending_job_never_runs():
+    queue = AnalysisQueue(max_concurrent=1, policy="fifo")
+    assert run_jobs(queue, [("a", 1.0), ("b", 1.0)], cancel=["a"]) == ["b"]
+
+
+def test_cancelling_a_running_job_frees_its_slot():
+    async def scenario():
+        queue = AnalysisQueue(max_concurrent=1, policy="fifo")
+        started = []
+        hang = asyncio.Event()
+
+        async def stuck():
+            await hang.wait()
+
+        async def waiting():
+            started.append("next")
+
+        queue.submit("stuck", 1.0, stuck)
+        queue.submit("next", 1.0, waiting)
+        await asyncio.sleep(0.01)
+        assert started == []
+        assert queue.cancel("stuck") == "running"
+        await asyncio.sleep(0.01)
+        assert started == ["next"]
+        assert queue.cancel("unknown") is None
+        hang.set()
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_reports_position_and_eta(monkeypatch):
+    clock = freeze_clock(monkeypatch, 0.0)
+
+    async def scenario():
+        queue = AnalysisQueue(max_concurrent=1, policy="fifo")
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+
+        queue.submit("running", 10.0, job)
+        queue.submit("first", 5.0, job)
+        queue.submit("second", 3.0, job)
+        clock[0] = 4.0
+
+        assert queue.snapshot("running") == {"queue_position": 0, "eta_seconds": 6.0}
+        assert queue.snapshot("first") == {"queue_position": 1, "eta_seconds": 11.0}
+        assert queue.snapshot("second") == {"queue_position": 2, "eta_seconds": 14.0}
+        assert queue.snapshot("unknown") is None
+        release.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AnalysisQueue(max_concurrent=1, policy="lifo")
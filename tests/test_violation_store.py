@@ -0,0 +1,67 @@
+import os
+
+from analysis.violation_store import ViolationStore
+
+
+def violation(file_name, line, rule="R1", message="first"):
+    return {"file": file_name, "line": line, "rule": rule, "message": message}
+
+
+SAMPLE = [
+    violation("b.c", 3),
+    violation("a.c", 7),
+    violation("a.c", 2),
+    violation("a.c", 7, message="duplicate"),
+    violation("a.c", 7, rule="R2"),
+    violation("b.c", 1),
+    violation("b.c", 3, message="duplicate"),
+]
+
+EXPECTED = [("a.c", 2, "R1"), ("a.c", 7, "R1"), ("a.c", 7, "R2"), ("b.c", 1, "R1"), ("b.c", 3, "R1")]
+
+
+def keys(violations):
+    return [(v["file"], v["line"], v["rule"]) for v in violations]
+
+
+def test_in_memory_dedupes_and_sorts():
+    store = ViolationStore(threshold=100)
+    store.extend(SAMPLE)
+    assert not store.spilled
+    assert len(store) == 5
+    result = store.result()
+    assert isinstance(result, list)
+    assert keys(result) == EXPECTED
+    assert all(v["message"] == "first" for v in result)
+
+
+def test_spilled_store_matches_in_memory_results():
+    store = ViolationStore(threshold=2)
+    store.extend(SAMPLE)
+    assert store.spilled
+    assert len(store) == 5
+    result = store.result()
+    assert keys(result) == EXPECTED
+    assert all(v["message"] == "first" for v in result)
+    # Iterable more than once, as statistics and reports both walk it
+    assert keys(result) == keys(result)
+    store.close()
+
+
+def test_duplicates_of_items_added_before_the_spill_are_dropped():
+    store = ViolationStore(threshold=1)
+    store.add(violation("a.c", 1))
+    store.add(violation("a.c", 2))
+    store.add(violation("a.c", 1, message="duplicate"))
+    assert len(store) == 2
+    assert [v["message"] for v in store] == ["first", "first"]
+    store.close()
+
+
+def test_close_removes_spill_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("analysis.violation_store.SPILL_DIR", str(tmp_path))
+    store = ViolationStore(threshold=1)
+    store.extend(SAMPLE)
+    assert len(os.listdir(tmp_path)) == 1
+    store.close()
+    assert os.listdir(tmp_path) == []